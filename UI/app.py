@@ -6,8 +6,11 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
 from datetime import timedelta, datetime
 
+# Absolute path of the UI directory, resolved once for all the paths below
+basedir = os.path.abspath(os.path.dirname(__file__))
+
 # Configure logging
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+log_dir = os.path.join(basedir, 'logs')
 if not os.path.exists(log_dir):
     os.makedirs(log_dir)
 
@@ -43,14 +46,13 @@ app_logger.info(f"Session cookie settings: SECURE={app.config['SESSION_COOKIE_SE
 app_logger.info(f"Session refresh each request: {app.config['SESSION_REFRESH_EACH_REQUEST']}")
 
 # Get the absolute path to the instance directory
-basedir = os.path.abspath(os.path.dirname(__file__))
 instance_path = os.path.join(basedir, 'instance')
 
 # Configure SQLAlchemy with multiple databases
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(instance_path, "database.db")}'
 
 # Add frontend database bind
-frontend_db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'database', 'to_frontend.db')
+frontend_db_path = os.path.join(os.path.dirname(basedir), 'data', 'database', 'to_frontend.db')
 app.config['SQLALCHEMY_BINDS'] = {
     'frontend': f'sqlite:///{frontend_db_path}'
 }
@@ -6,70 +6,224 @@ project_root = str(Path(__file__).parent.parent)
 sys.path.append(project_root)
 
 import os
+import re
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
+from sqlalchemy import exists
 from data.pipeline_db_config import SessionLocal
 from data.pipeline_db_models import AnalysisResult, CleanedContent, ScrapedContent, SearchResult
-import logging
+from data.llm_cache import make_cache_key, get_cached_response, store_cached_response
+from data.jsonutil import json_loads
+from logging_config import setup_logging
 
 # Load environment variables from .env file
 load_dotenv()
 
-logger = logging.getLogger(__name__)
+# Read once at import; every agent instance shares the same key
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+GPT_MODEL = "gpt-4.1-nano"
+
+# Setup logging
+loggers = setup_logging()
+logger = loggers["analysis"]
+
+# Independent GPT calls for the same item (analysis, summary, sentiment) run on this
+# pool. Only leaf _call_gpt work is submitted here, never work that submits again,
+# so callers waiting on these futures cannot deadlock the pool.
+GPT_CALL_WORKERS = int(os.getenv("ANALYST_GPT_WORKERS", "8"))
+gpt_executor = ThreadPoolExecutor(max_workers=GPT_CALL_WORKERS, thread_name_prefix="gpt-call")
+
+# Companies are analyzed in parallel on a separate pool; its threads wait on
+# gpt_executor futures, so the two pools must never be the same
+ANALYSIS_WORKERS = int(os.getenv("ANALYST_WORKERS", "4"))
+company_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analyst-company")
+
+# Analyses are saved in batches of this size as they finish, so an interrupted run
+# keeps its finished work; get_company_data skips saved content on the next run
+ANALYSIS_SAVE_BATCH_SIZE = int(os.getenv("ANALYST_SAVE_BATCH_SIZE", "20"))
+
+# Characters of cleaned content sent to the API per item (roughly 400 tokens)
+CONTENT_EXCERPT_LENGTH = 1500
+
+# Patterns for reading a sentiment out of a free-text reply
+SENTIMENT_SCORE_RE = re.compile(r'(?:score|sentiment):\s*([-+]?\d+\.\d+)', re.IGNORECASE)
+SENTIMENT_LABEL_RE = re.compile(r'\b(positive|negative|neutral)\b', re.IGNORECASE)
+
+SENTIMENT_LABELS = ("negative", "neutral", "positive")
+
+def sentiment_label_for_score(score):
+    """Map a score to its label: above 0.2 is positive, below -0.2 negative, otherwise neutral."""
+    # The two comparisons add up to an index into SENTIMENT_LABELS
+    return SENTIMENT_LABELS[(score >= -0.2) + (score > 0.2)]
+
+# Prompt templates, filled in with str.format for each call
+ANALYST_SYSTEM_PROMPT = "You are an expert financial and business analyst. Provide insightful analysis with objective sentiment assessment."
+
+SENTIMENT_RESPONSE_FORMAT = """Respond ONLY with a JSON object that has these three fields:
+1. "score": a numerical value between -1.0 (very negative) and 1.0 (very positive), with 0.0 being neutral
+2. "label": one of "positive", "neutral", or "negative"
+3. "explanation": a brief explanation of your sentiment assessment
+
+IMPORTANT: Return ONLY a valid JSON object with these fields. Do not include any other text."""
+
+OVERALL_ANALYSIS_PROMPT = """Analyze the following company:
+
+Company Information:
+- Company ID: {company_id}
+- Company Name: {company_name}
+- Industry: {industry}
+- Location: {location}
+- Description: {description}
+- Services: {services}
+
+The company has {content_count} content items from its web presence.
+
+Based on this information, provide a brief overall analysis of the company that includes:
+1. Market positioning
+2. Business focus
+3. Overall sentiment analysis
+
+For the sentiment analysis, you MUST include:
+- A numerical score between -1.0 (very negative) and 1.0 (very positive), with 0.0 being neutral
+- A sentiment label (positive, neutral, or negative)
+- A brief explanation of the sentiment assessment
+
+Include a dedicated "SENTIMENT ANALYSIS" section at the end with this format:
+SENTIMENT ANALYSIS:
+Score: [numerical value between -1.0 and 1.0]
+Label: [positive/neutral/negative]
+Explanation: [brief explanation]"""
+
+CONTENT_ANALYSIS_PROMPT = """Analyze the following webpage content for {company_name} ({company_id}):
+
+URL: {url}
+Title: {title}
+Domain: {domain}
+Publication Date: {publication_date}
+Meta Description: {meta_description}
+
+Content:
+{content}
+
+Provide a brief analysis of this content that includes:
+1. Key themes or topics
+2. Notable information or developments"""
+
+COMPANY_DESCRIPTION = """{company_name} is a {industry} company based in {location}.
+{description}
+Services: {services}"""
+
+# The response format has no placeholders, so it is joined in once here
+COMPANY_SENTIMENT_PROMPT = """Analyze the sentiment for the following company:
+
+{company_description}
+
+""" + SENTIMENT_RESPONSE_FORMAT
+
+CONTENT_SENTIMENT_PROMPT = """Analyze the sentiment of this webpage content:
+
+URL: {url}
+Title: {title}
+
+Content:
+{content}
+
+""" + SENTIMENT_RESPONSE_FORMAT
+
+SUMMARY_PROMPT = """Summarize the following content in exactly 3 sentences. Focus on the key points and main message:
+
+{content}
+
+Provide ONLY the 3-sentence summary. Do not include any additional text or explanations."""
 
 class AnalystAgent:
     def __init__(self):
         """Initialize the analyst agent that processes company data and generates analysis."""
-        self.api_key = os.getenv("1OPENAI_API_KEY")
+        self.api_key = OPENAI_API_KEY
         
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY in your .env file.")
+        
+        # Reuse one HTTP connection pool for all API calls instead of a new
+        # TCP/TLS handshake per request
+        self.http_session = requests.Session()
+        # Every request goes to the OpenAI API, so the headers are set once here
+        self.http_session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        })
+        # Both pools call the API, so size the connection pool for all their threads.
+        # Rate limits and transient 5xx are retried with backoff (honouring Retry-After);
+        # read timeouts are not, so a slow completion is never sent twice
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=GPT_CALL_WORKERS + ANALYSIS_WORKERS,
+            max_retries=Retry(
+                total=3,
+                read=0,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False
+            )
+        )
+        self.http_session.mount("https://", adapter)
+    
+    def close(self):
+        """Release the HTTP connections held by the agent."""
+        self.http_session.close()
     
     def get_company_data(self):
         """Get all companies' data from the database."""
         session = SessionLocal()
         try:
-            # Get all cleaned content that hasn't been analyzed yet
-            cleaned_contents = session.query(CleanedContent).filter(
-                ~CleanedContent.analysis_results.any()
+            # Get all cleaned content that hasn't been analyzed yet. Only the columns the
+            # analysis uses are selected, so no ORM objects are built and the raw
+            # scraped HTML is never loaded
+            rows = session.query(
+                CleanedContent.id,
+                CleanedContent.cleaned_text,
+                ScrapedContent.domain,
+                SearchResult.company_name,
+                SearchResult.link,
+                SearchResult.title,
+                SearchResult.snippet,
+                SearchResult.published_date,
+                SearchResult.raw_json
+            ).join(
+                ScrapedContent, CleanedContent.scraped_content_id == ScrapedContent.id
+            ).join(
+                SearchResult, ScrapedContent.search_result_id == SearchResult.id
+            ).filter(
+                ~exists().where(AnalysisResult.cleaned_content_id == CleanedContent.id)
             ).all()
             
             company_data_list = []
-            for cleaned_content in cleaned_contents:
-                # Check if analysis already exists for this cleaned content
-                existing_analysis = session.query(AnalysisResult).filter(
-                    AnalysisResult.cleaned_content_id == cleaned_content.id
-                ).first()
-                
-                if existing_analysis:
-                    logger.debug(f"Skipping duplicate analysis for cleaned content ID {cleaned_content.id}")
-                    continue
-                
-                # Get the associated scraped content and search result
-                scraped_content = cleaned_content.scraped_content
-                search_result = scraped_content.search_result
-                
+            for row in rows:
                 # Extract industry and other metadata from the search result's raw_json
-                raw_json = search_result.raw_json or {}
+                raw_json = row.raw_json or {}
                 metadata = raw_json.get('metadata', {})
                 
                 # Create company data structure
                 company_data = {
-                    "company_id": str(cleaned_content.id),
-                    "company_name": search_result.company_name,
+                    "company_id": str(row.id),
+                    "company_name": row.company_name,
                     "industry": metadata.get('industry', 'Unknown'),
                     "location": metadata.get('location', 'Unknown'),
                     "description": metadata.get('description', ''),
                     "services": metadata.get('services', []),
                     "content_items": [{
-                        "url": search_result.link,
-                        "title": search_result.title,
-                        "domain": scraped_content.domain,
-                        "publication_date": search_result.published_date.isoformat() if search_result.published_date else None,
-                        "meta_description": search_result.snippet,
-                        "cleaned_content": cleaned_content.cleaned_text
+                        "url": row.link,
+                        "title": row.title,
+                        "domain": row.domain,
+                        "publication_date": row.published_date.isoformat() if row.published_date else None,
+                        "meta_description": row.snippet,
+                        "cleaned_content": row.cleaned_text
                     }]
                 }
                 company_data_list.append(company_data)
@@ -93,15 +247,15 @@ class AnalystAgent:
             "services": company_data.get("services", []),
             "content_items": company_data.get("content_items", [])
         }
+        # Joined once here and shared by every prompt that lists the services
+        company_info["services_text"] = ', '.join(company_info["services"])
+        content_items = company_info["content_items"]
         
         # Create the overall company analysis
-        company_analysis = self._analyze_overall_company(company_info, company_data.get("content_items", []))
+        company_analysis = self._analyze_overall_company(company_info, content_items)
         
         # Analyze each content item separately
-        content_analyses = []
-        for item in company_data.get("content_items", []):
-            content_analysis = self._analyze_content_item(company_info, item)
-            content_analyses.append(content_analysis)
+        content_analyses = [self._analyze_content_item(company_info, item) for item in content_items]
         
         # Create complete analysis result
         analysis_result = {
@@ -117,41 +271,22 @@ class AnalystAgent:
     def _analyze_overall_company(self, company_info, content_items):
         """Generate overall company analysis."""
         # Create prompt for overall company analysis
-        prompt = f"""
-        Analyze the following company:
-        
-        Company Information:
-        - Company ID: {company_info['company_id']}
-        - Company Name: {company_info['company_name']}
-        - Industry: {company_info['industry']}
-        - Location: {company_info['location']}
-        - Description: {company_info['description']}
-        - Services: {', '.join(company_info['services'])}
-        
-        The company has {len(content_items)} content items from its web presence.
-        
-        Based on this information, provide a brief overall analysis of the company that includes:
-        1. Market positioning
-        2. Business focus
-        3. Overall sentiment analysis
-        
-        For the sentiment analysis, you MUST include:
-        - A numerical score between -1.0 (very negative) and 1.0 (very positive), with 0.0 being neutral
-        - A sentiment label (positive, neutral, or negative)
-        - A brief explanation of the sentiment assessment
-        
-        Include a dedicated "SENTIMENT ANALYSIS" section at the end with this format:
-        SENTIMENT ANALYSIS:
-        Score: [numerical value between -1.0 and 1.0]
-        Label: [positive/neutral/negative]
-        Explanation: [brief explanation]
-        """
+        prompt = OVERALL_ANALYSIS_PROMPT.format(
+            company_id=company_info['company_id'],
+            company_name=company_info['company_name'],
+            industry=company_info['industry'],
+            location=company_info['location'],
+            description=company_info['description'],
+            services=company_info['services_text'],
+            content_count=len(content_items)
+        )
         
-        # Call GPT-4.1 Nano for overall analysis
-        analysis_text = self._call_gpt(prompt)
+        # Call GPT-4.1 Nano for overall analysis in the background
+        analysis_future = gpt_executor.submit(self._call_gpt, prompt)
         
         # Extract sentiment directly from GPT for reliability
         sentiment = self._get_direct_sentiment(company_info, content_items)
+        analysis_text = analysis_future.result()
         
         return {
             "analysis_text": analysis_text,
@@ -166,39 +301,31 @@ class AnalystAgent:
         domain = content_item.get("domain", "")
         publication_date = content_item.get("publication_date", "")
         meta_description = content_item.get("meta_description", "")
-        cleaned_content = content_item.get("cleaned_content", "")
-        
-        # Generate summary
-        summary = self._generate_summary(content_item)
+        # Limit content length for API once; all three prompts share the excerpt
+        cleaned_content = self._truncate_content(content_item.get("cleaned_content", ""), CONTENT_EXCERPT_LENGTH)
         
-        # Limit content length for API
-        max_content_length = 1500
-        if len(cleaned_content) > max_content_length:
-            cleaned_content = cleaned_content[:max_content_length] + "..."
+        # Generate summary and sentiment in the background; both are independent
+        # of the content analysis below
+        summary_future = gpt_executor.submit(self._generate_summary, cleaned_content)
+        sentiment_future = gpt_executor.submit(self._get_content_sentiment, content_item, cleaned_content)
         
         # Create prompt for content analysis
-        prompt = f"""
-        Analyze the following webpage content for {company_info['company_name']} ({company_info['company_id']}):
-        
-        URL: {url}
-        Title: {title}
-        Domain: {domain}
-        Publication Date: {publication_date}
-        Meta Description: {meta_description}
-        
-        Content:
-        {cleaned_content}
-        
-        Provide a brief analysis of this content that includes:
-        1. Key themes or topics
-        2. Notable information or developments
-        """
+        prompt = CONTENT_ANALYSIS_PROMPT.format(
+            company_name=company_info['company_name'],
+            company_id=company_info['company_id'],
+            url=url,
+            title=title,
+            domain=domain,
+            publication_date=publication_date,
+            meta_description=meta_description,
+            content=cleaned_content
+        )
         
         # Call GPT-4.1 Nano for content analysis
         analysis_text = self._call_gpt(prompt)
         
-        # Get sentiment directly using a dedicated sentiment call
-        sentiment = self._get_content_sentiment(content_item)
+        summary = summary_future.result()
+        sentiment = sentiment_future.result()
         
         return {
             "url": url,
@@ -211,179 +338,155 @@ class AnalystAgent:
     def _get_direct_sentiment(self, company_info, content_items):
         """Get sentiment directly using a dedicated sentiment-focused call."""
         # Create a simple description for sentiment analysis
-        company_description = f"""{company_info['company_name']} is a {company_info['industry']} company based in {company_info['location']}. 
-        {company_info['description']}
-        Services: {', '.join(company_info['services'])}"""
+        company_description = COMPANY_DESCRIPTION.format(
+            company_name=company_info['company_name'],
+            industry=company_info['industry'],
+            location=company_info['location'],
+            description=company_info['description'],
+            services=company_info['services_text']
+        )
         
         # Create a focused sentiment prompt
-        prompt = f"""
-        Analyze the sentiment for the following company:
-        
-        {company_description}
-        
-        Respond ONLY with a JSON object that has these three fields:
-        1. "score": a numerical value between -1.0 (very negative) and 1.0 (very positive), with 0.0 being neutral
-        2. "label": one of "positive", "neutral", or "negative"
-        3. "explanation": a brief explanation of your sentiment assessment
+        prompt = COMPANY_SENTIMENT_PROMPT.format(company_description=company_description)
         
-        IMPORTANT: Return ONLY a valid JSON object with these fields. Do not include any other text.
-        """
-        
-        # Call GPT for sentiment
-        response = self._call_gpt(prompt)
-        
-        try:
-            # Try to parse as JSON
-            sentiment = json.loads(response)
-            # Ensure the expected fields exist
-            if not all(key in sentiment for key in ["score", "label", "explanation"]):
-                # If missing keys, create default sentiment
-                return self._create_default_sentiment(response)
-            return sentiment
-        except json.JSONDecodeError:
-            # If not valid JSON, create default sentiment
-            return self._create_default_sentiment(response)
+        return self._sentiment_from_prompt(prompt)
     
-    def _get_content_sentiment(self, content_item):
-        """Get sentiment for a specific content item using a dedicated sentiment analysis."""
+    def _get_content_sentiment(self, content_item, cleaned_content):
+        """Get sentiment for a specific content item from its truncated content."""
         url = content_item.get("url", "")
         title = content_item.get("title", "")
-        cleaned_content = content_item.get("cleaned_content", "")
-        
-        # Limit content length
-        if len(cleaned_content) > 1000:
-            cleaned_content = cleaned_content[:1000] + "..."
         
         # Create a focused sentiment prompt
-        prompt = f"""
-        Analyze the sentiment of this webpage content:
-        
-        URL: {url}
-        Title: {title}
-        
-        Content:
-        {cleaned_content}
-        
-        Respond ONLY with a JSON object that has these three fields:
-        1. "score": a numerical value between -1.0 (very negative) and 1.0 (very positive), with 0.0 being neutral
-        2. "label": one of "positive", "neutral", or "negative"
-        3. "explanation": a brief explanation of your sentiment assessment
+        prompt = CONTENT_SENTIMENT_PROMPT.format(url=url, title=title, content=cleaned_content)
         
-        IMPORTANT: Return ONLY a valid JSON object with these fields. Do not include any other text.
-        """
-        
-        # Call GPT for sentiment
-        response = self._call_gpt(prompt)
+        return self._sentiment_from_prompt(prompt)
+    
+    def _sentiment_from_prompt(self, prompt):
+        """Request a sentiment JSON object for the prompt and parse it."""
+        # JSON mode makes the API return a bare object, so no code fences to strip
+        response, cache_key, from_cache = self._request_gpt(prompt, response_format={"type": "json_object"})
         
         try:
-            # Try to parse as JSON
-            sentiment = json.loads(response)
+            sentiment = json_loads(response)
             # Ensure the expected fields exist
             if not all(key in sentiment for key in ["score", "label", "explanation"]):
                 # If missing keys, create default sentiment
                 return self._create_default_sentiment(response)
+            # Only cache replies that could be parsed, so a bad reply is retried next run
+            if cache_key and not from_cache:
+                store_cached_response(cache_key, GPT_MODEL, response)
             return sentiment
         except json.JSONDecodeError:
-            # If not valid JSON, create default sentiment
+            # A reply cut off at max_tokens is still not valid JSON
             return self._create_default_sentiment(response)
     
     def _create_default_sentiment(self, text):
-        """Create a default sentiment object based on text analysis."""
-        import re
-        
-        # Default values
+        """Create a default sentiment object from a reply that wasn't a usable JSON object.
+
+        Sentiment replies are requested in JSON mode, so this only sees truncated or
+        incomplete replies; it falls back to neutral rather than calling the API again.
+        """
+        # Default value
         sentiment_score = 0.0
-        sentiment_label = "neutral"
         
         # Try to extract score from text
-        score_match = re.search(r'(?:score|sentiment):\s*([-+]?\d+\.\d+)', text, re.IGNORECASE)
+        score_match = SENTIMENT_SCORE_RE.search(text)
         if score_match:
             try:
                 sentiment_score = float(score_match.group(1))
-                sentiment_label = "positive" if sentiment_score > 0.2 else "negative" if sentiment_score < -0.2 else "neutral"
             except ValueError:
                 pass
         
         # Try to find sentiment label if score was not found
         if sentiment_score == 0.0:
-            if re.search(r'\bpositive\b', text, re.IGNORECASE):
+            # Collect the labels in one scan; positive still wins over negative,
+            # and a neutral label keeps the default score
+            labels = {label.lower() for label in SENTIMENT_LABEL_RE.findall(text)}
+            if "positive" in labels:
                 sentiment_score = 0.7
-                sentiment_label = "positive"
-            elif re.search(r'\bnegative\b', text, re.IGNORECASE):
+            elif "negative" in labels:
                 sentiment_score = -0.7
-                sentiment_label = "negative"
-            elif re.search(r'\bneutral\b', text, re.IGNORECASE):
-                sentiment_score = 0.0
-                sentiment_label = "neutral"
-        
-        # If still no sentiment found, make one more attempt with a focused API call
-        if sentiment_score == 0.0 and not re.search(r'\bneutral\b', text, re.IGNORECASE):
-            # Make one more attempt with even more direct prompt
-            retry_prompt = f"Based on this text, provide ONLY a sentiment score between -1.0 and 1.0:\n\n{text}"
-            retry_response = self._call_gpt(retry_prompt)
-            
-            # Try to find a number in the response
-            number_match = re.search(r'([-+]?\d+\.\d+)', retry_response)
-            if number_match:
-                try:
-                    sentiment_score = float(number_match.group(1))
-                    sentiment_label = "positive" if sentiment_score > 0.2 else "negative" if sentiment_score < -0.2 else "neutral"
-                except ValueError:
-                    pass
         
+        # The label always follows from the final score
         return {
             "score": sentiment_score,
-            "label": sentiment_label,
+            "label": sentiment_label_for_score(sentiment_score),
             "explanation": text
         }
     
-    def _call_gpt(self, prompt):
-        """Call GPT-4.1 Nano with the given prompt."""
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+    def _truncate_content(self, text, max_length):
+        """Trim text to max_length characters, keeping both the beginning and the end."""
+        if len(text) <= max_length:
+            return text
+        
+        # Reputation signals tend to sit in the lede and the conclusion, so keep
+        # the head and the tail rather than cutting the article off midway
+        half = max_length // 2
+        return text[:half] + "\n...\n" + text[-half:]
+    
+    def _call_gpt(self, prompt, response_format=None):
+        """Call GPT-4.1 Nano with the given prompt, optionally constraining the response format."""
+        content, cache_key, from_cache = self._request_gpt(prompt, response_format)
+        if cache_key and not from_cache:
+            store_cached_response(cache_key, GPT_MODEL, content)
+        return content
+    
+    def _request_gpt(self, prompt, response_format=None):
+        """Call GPT-4.1 Nano without storing the reply in the cache.
         
+        Returns:
+            Tuple of (response content, cache key or None, whether it came from the cache)
+        """
         payload = {
-            "model": "gpt-4.1-nano",
+            "model": GPT_MODEL,
             "messages": [
-                {"role": "system", "content": "You are an expert financial and business analyst. Provide insightful analysis with objective sentiment assessment."},
+                {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            # Low temperature keeps the assessments consistent and the responses cacheable
+            "temperature": 0.1,
+            "max_tokens": 1500  # Enough for the longest analysis; caps cost and latency
         }
-        
-        response = requests.post(
+        if response_format:
+            payload["response_format"] = response_format
+        
+        # Reuse the stored response if this exact request was made before, e.g. when
+        # a run is repeated before its analysis was saved
+        cache_key = make_cache_key(payload)
+        content = get_cached_response(cache_key) if cache_key else None
+        if content is not None:
+            logger.debug("Using cached GPT response")
+            return content, cache_key, True
+        
+        response = self.http_session.post(
             "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload
+            json=payload,
+            timeout=(5, 45)  # (connect, read) so a hung connection can't stall the run
         )
         
         if response.status_code != 200:
             raise Exception(f"API call failed with status code {response.status_code}: {response.text}")
         
-        response_data = response.json()
-        return response_data["choices"][0]["message"]["content"]
+        response_data = json_loads(response.content)
+        content = response_data["choices"][0]["message"]["content"]
+        
+        return content, cache_key, False
     
     def save_analysis(self, analysis_result):
-        """Save analysis result to the database."""
+        """Save analysis result to the database.
+        
+        The company ID is the cleaned content ID read by get_company_data, so it is
+        used directly; only its existence is checked instead of fetching the row.
+        """
         session = SessionLocal()
         try:
-            # Get the cleaned content record
-            cleaned_content = session.query(CleanedContent).filter(
-                CleanedContent.id == analysis_result["company_id"]
-            ).first()
-            
-            if not cleaned_content:
+            # SQLite doesn't enforce the foreign key, so check the cleaned content exists
+            cleaned_content_id = int(analysis_result["company_id"])
+            if not session.query(exists().where(CleanedContent.id == cleaned_content_id)).scalar():
                 raise ValueError(f"No cleaned content found for company ID {analysis_result['company_id']}")
             
             # Create analysis result record
-            analysis = AnalysisResult(
-                cleaned_content_id=cleaned_content.id,
-                sentiment_score=analysis_result["overall_analysis"]["sentiment"]["score"],
-                sentiment_label=analysis_result["overall_analysis"]["sentiment"]["label"],
-                analysis_text=analysis_result["overall_analysis"]["analysis_text"],
-                summary=analysis_result["content_analyses"][0]["summary"] if analysis_result["content_analyses"] else None
-            )
+            analysis = AnalysisResult(**self._analysis_row(cleaned_content_id, analysis_result))
             
             session.add(analysis)
             session.commit()
@@ -395,46 +498,114 @@ class AnalystAgent:
         finally:
             session.close()
     
-    def run_analysis(self):
-        """Run analysis on all company data from the database."""
-        company_data_list = self.get_company_data()
-        analysis_results = []
+    def bulk_save_analyses(self, analysis_results):
+        """Save analysis results in one transaction, falling back to one save per result on failure.
         
-        for company_data in company_data_list:
-            try:
-                print(f"Analyzing company: {company_data['company_name']}...")
-                analysis_result = self.analyze_company(company_data)
-                analysis_id = self.save_analysis(analysis_result)
-                analysis_results.append(analysis_result)
-                print(f"Analysis saved to database with ID: {analysis_id}")
-            except Exception as e:
-                print(f"Error analyzing company {company_data['company_name']}: {str(e)}")
+        Returns:
+            List of the analysis results that were saved
+        """
+        if not analysis_results:
+            return []
         
-        return analysis_results
-
-    def _generate_summary(self, content_item):
-        """Generate a 3-sentence summary of the cleaned content using GPT-4.1 Nano."""
-        cleaned_content = content_item.get("cleaned_content", "")
+        # Results retried one by one if the bulk save fails; narrowed to those whose
+        # cleaned content exists before any row is built
+        retry_results = analysis_results
+        
+        session = SessionLocal()
+        try:
+            # Check that all the cleaned content rows exist with a single query
+            cleaned_content_ids = {int(analysis_result["company_id"]) for analysis_result in analysis_results}
+            existing_ids = {
+                cleaned_content_id for (cleaned_content_id,) in session.query(CleanedContent.id).filter(
+                    CleanedContent.id.in_(cleaned_content_ids)
+                )
+            }
+            
+            valid_results = []
+            for analysis_result in analysis_results:
+                if int(analysis_result["company_id"]) not in existing_ids:
+                    logger.error(f"No cleaned content found for company ID {analysis_result['company_id']}")
+                    continue
+                valid_results.append(analysis_result)
+            retry_results = valid_results
+            
+            rows = [
+                self._analysis_row(int(analysis_result["company_id"]), analysis_result)
+                for analysis_result in valid_results
+            ]
+            session.bulk_insert_mappings(AnalysisResult, rows)
+            session.commit()
+            return valid_results
+        except Exception as e:
+            logger.error(f"Error saving analyses in bulk, retrying one by one: {e}")
+            session.rollback()
+        finally:
+            session.close()
         
-        # Limit content length for API
-        max_content_length = 1500
-        if len(cleaned_content) > max_content_length:
-            cleaned_content = cleaned_content[:max_content_length] + "..."
+        # Save what we can so a single bad result doesn't lose the whole run
+        saved_results = []
+        for analysis_result in retry_results:
+            try:
+                self.save_analysis(analysis_result)
+                saved_results.append(analysis_result)
+            except Exception as e:
+                logger.error(f"Error saving analysis for {analysis_result['company_name']}: {e}")
+        return saved_results
+    
+    def _analysis_row(self, cleaned_content_id, analysis_result):
+        """Build the AnalysisResult column values for an analysis result."""
+        overall_analysis = analysis_result["overall_analysis"]
+        return {
+            "cleaned_content_id": cleaned_content_id,
+            "sentiment_score": overall_analysis["sentiment"]["score"],
+            "sentiment_label": overall_analysis["sentiment"]["label"],
+            "analysis_text": overall_analysis["analysis_text"],
+            "summary": analysis_result["content_analyses"][0]["summary"] if analysis_result["content_analyses"] else None
+        }
+    
+    def run_analysis(self):
+        """Run analysis on all company data from the database."""
+        company_data_list = self.get_company_data()
         
-        prompt = f"""
-        Summarize the following content in exactly 3 sentences. Focus on the key points and main message:
-
-        {cleaned_content}
+        # Each company is dominated by independent API round trips, so run them concurrently
+        results = company_executor.map(self._analyze_company_safely, company_data_list)
+        
+        # Save finished analyses a batch at a time instead of one transaction per company
+        saved_results = []
+        pending = []
+        for analysis_result in results:
+            if analysis_result is not None:
+                pending.append(analysis_result)
+            if len(pending) >= ANALYSIS_SAVE_BATCH_SIZE:
+                saved_results.extend(self.bulk_save_analyses(pending))
+                pending = []
+        saved_results.extend(self.bulk_save_analyses(pending))
+        
+        logger.info(f"Saved {len(saved_results)} analyses to database")
+        return saved_results
+    
+    def _analyze_company_safely(self, company_data):
+        """Analyze one company. Returns None if the analysis fails."""
+        try:
+            logger.info(f"Analyzing company: {company_data['company_name']}...")
+            return self.analyze_company(company_data)
+        except Exception as e:
+            logger.error(f"Error analyzing company {company_data['company_name']}: {str(e)}")
+            return None
 
-        Provide ONLY the 3-sentence summary. Do not include any additional text or explanations.
-        """
+    def _generate_summary(self, cleaned_content):
+        """Generate a 3-sentence summary of the truncated cleaned content using GPT-4.1 Nano."""
+        prompt = SUMMARY_PROMPT.format(content=cleaned_content)
         
         return self._call_gpt(prompt)
 
 def main():
     """Main function to run the analyst agent."""
     analyst = AnalystAgent()
-    analysis_results = analyst.run_analysis()
+    try:
+        analysis_results = analyst.run_analysis()
+    finally:
+        analyst.close()
     
     # Print summary
     print(f"\nAnalyzed {len(analysis_results)} companies:")
@@ -6,94 +6,131 @@ project_root = str(Path(__file__).parent.parent)
 sys.path.append(project_root)
 
 import os
+import re
 import logging
 import argparse
 from typing import Dict, List, Any, Optional
 import html2text
 from dotenv import load_dotenv
+from sqlalchemy import exists
 from tqdm import tqdm
 from data.pipeline_db_config import SessionLocal
 from data.pipeline_db_models import SearchResult, ScrapedContent, CleanedContent
 
-# Setup argument parser
-parser = argparse.ArgumentParser(description="Clean and validate scraped company content")
-parser.add_argument("--min-words", type=int, default=50, help="Minimum word count threshold")
-parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
-args = parser.parse_args()
-
-# Setup logging
-log_level = logging.DEBUG if args.verbose else logging.INFO
-logging.basicConfig(
-    level=log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
 logger = logging.getLogger("cleaning_validation_agent")
 
 # Load environment variables (kept for potential future use)
 load_dotenv()
 
 # Constants
-MIN_WORD_COUNT = args.min_words
+MIN_WORD_COUNT = 50
+BATCH_SIZE = 50
+
+# Content whose sample is less than 5% letters is a garbled or binary scrape
+MIN_ALPHA_RATIO = 0.05
+ALPHA_SAMPLE_SIZE = 1000
+
+# Compiled once; used for every cleaned document
+EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
 
 class CleaningValidationAgent:
-    def __init__(self, min_word_count=MIN_WORD_COUNT):
+    def __init__(self, min_word_count=MIN_WORD_COUNT, batch_size=BATCH_SIZE):
         """Initialize the cleaning and validation agent."""
         self.min_word_count = min_word_count
+        self.batch_size = batch_size
         self.session = SessionLocal()
-        logger.debug(f"Initialized agent with minimum word count {min_word_count}")
+        logger.debug("Initialized agent with minimum word count %d", min_word_count)
     
     def _clean_html(self, content: str) -> str:
         """Clean HTML and extract readable text."""
         try:
-            # Using html2text to convert HTML to plain text
-            converter = html2text.HTML2Text()
-            converter.ignore_links = False
-            converter.ignore_images = True
-            converter.ignore_tables = False
-            converter.body_width = 0  # No line wrapping
-            
-            # Clean the text
-            cleaned_text = converter.handle(content).strip()
+            if '<' not in content:
+                # The scraper stores extracted text, not markup, so there is
+                # nothing for the HTML parser to do here
+                cleaned_text = content.strip()
+            else:
+                # Using html2text to convert HTML to plain text
+                converter = html2text.HTML2Text()
+                converter.ignore_links = False
+                converter.ignore_images = True
+                converter.ignore_tables = False
+                converter.body_width = 0  # No line wrapping
+                
+                # Clean the text
+                cleaned_text = converter.handle(content).strip()
             
             # Additional cleaning steps
             # Remove excessive newlines
-            import re
-            cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
+            cleaned_text = EXCESS_NEWLINES_RE.sub('\n\n', cleaned_text)
             
             return cleaned_text
         except Exception as e:
             logger.error(f"Failed to clean HTML: {e}")
             return content  # Return original content if cleaning fails
     
+    def _alpha_ratio(self, text: str) -> float:
+        """Return the share of alphabetic characters in the start of the text."""
+        sample = text[:ALPHA_SAMPLE_SIZE]
+        if not sample:
+            return 0.0
+        return sum(c.isalpha() for c in sample) / len(sample)
+    
+    def _commit_batch(self, pending):
+        """Commit a batch of processed items, falling back to per-item commits on failure."""
+        if not pending:
+            return
+        
+        try:
+            self.session.commit()
+        except Exception as e:
+            logger.error(f"Error saving batch to database, retrying items one by one: {e}")
+            self.session.rollback()
+            
+            # Re-apply each change on its own so a single bad record doesn't lose the batch
+            for scraped_content, status, cleaned_content in pending:
+                scraped_content.status = status
+                if cleaned_content is not None:
+                    self.session.add(cleaned_content)
+                try:
+                    self.session.commit()
+                except Exception as e:
+                    logger.error(f"Error saving to database: {e}")
+                    self.session.rollback()
+        finally:
+            pending.clear()
+    
+    def _iter_scraped_content(self, content_ids):
+        """Yield ScrapedContent rows for the given IDs, loading one batch at a time."""
+        for start in range(0, len(content_ids), self.batch_size):
+            chunk = content_ids[start:start + self.batch_size]
+            yield from self.session.query(ScrapedContent).filter(
+                ScrapedContent.id.in_(chunk)
+            ).order_by(ScrapedContent.id).all()
+    
     def process_scraped_content(self):
         """Process all scraped content from the database using word count filter."""
         logger.info(f"Starting cleaning process with minimum word count {self.min_word_count}")
         
         try:
-            # Get all scraped content that hasn't been processed yet
-            scraped_contents = self.session.query(ScrapedContent).filter(
-                ScrapedContent.status == "new"
-            ).all()
+            # Get the IDs of scraped content that hasn't been processed yet and has no
+            # cleaned content; the rows (with their full page text) are loaded batch by
+            # batch while processing
+            content_ids = [row.id for row in self.session.query(ScrapedContent.id).filter(
+                ScrapedContent.status == "new",
+                ~exists().where(CleanedContent.scraped_content_id == ScrapedContent.id)
+            ).order_by(ScrapedContent.id)]
             
-            logger.info(f"Found {len(scraped_contents)} items to process")
+            logger.info(f"Found {len(content_ids)} items to process")
             
             new_content_count = 0
-            duplicate_content_count = 0
             too_short_count = 0
+            garbled_count = 0
+            
+            # Status changes and new rows waiting for the next batch commit
+            pending = []
             
             # Process each item with a progress bar
-            for scraped_content in tqdm(scraped_contents, desc="Processing content"):
-                # Check if cleaned content already exists for this scraped content
-                existing_cleaned = self.session.query(CleanedContent).filter(
-                    CleanedContent.scraped_content_id == scraped_content.id
-                ).first()
-                
-                if existing_cleaned:
-                    duplicate_content_count += 1
-                    logger.debug(f"Skipping duplicate cleaned content for scraped content ID {scraped_content.id}")
-                    continue
-                
+            for scraped_content in tqdm(self._iter_scraped_content(content_ids), total=len(content_ids), desc="Processing content"):
                 # Clean the content
                 cleaned_text = self._clean_html(scraped_content.main_content)
                 
@@ -105,42 +142,43 @@ class CleaningValidationAgent:
                     # Mark as too short and skip further processing
                     scraped_content.status = "too_short"
                     too_short_count += 1
-                    try:
-                        self.session.commit()
-                        logger.info(f"Marked content ID {scraped_content.id} as too short ({word_count} words)")
-                    except Exception as e:
-                        logger.error(f"Error updating status: {e}")
-                        self.session.rollback()
-                    continue
-                
-                # If we reach here, the content has enough words (≥ min_word_count)
-                # Create cleaned content record
-                cleaned_content = CleanedContent(
-                    scraped_content_id=scraped_content.id,
-                    cleaned_text=cleaned_text,
-                    word_count=word_count,
-                    status="new"
-                )
-                
-                # Add to session
-                self.session.add(cleaned_content)
-                new_content_count += 1
-                
-                # Update scraped content status
-                scraped_content.status = "processed"
-                
-                # Commit after each successful processing
-                try:
-                    self.session.commit()
+                    pending.append((scraped_content, "too_short", None))
+                    logger.info(f"Marked content ID {scraped_content.id} as too short ({word_count} words)")
+                elif self._alpha_ratio(cleaned_text) < MIN_ALPHA_RATIO:
+                    # Mostly symbols or binary data; keep it away from the analysis step
+                    scraped_content.status = "garbled"
+                    garbled_count += 1
+                    pending.append((scraped_content, "garbled", None))
+                    logger.info(f"Marked content ID {scraped_content.id} as garbled")
+                else:
+                    # If we reach here, the content has enough words (≥ min_word_count)
+                    # Create cleaned content record
+                    cleaned_content = CleanedContent(
+                        scraped_content_id=scraped_content.id,
+                        cleaned_text=cleaned_text,
+                        word_count=word_count,
+                        status="new"
+                    )
+                    
+                    # Add to session
+                    self.session.add(cleaned_content)
+                    new_content_count += 1
+                    
+                    # Update scraped content status
+                    scraped_content.status = "processed"
+                    pending.append((scraped_content, "processed", cleaned_content))
                     logger.info(f"Processed content ID {scraped_content.id} with {word_count} words")
-                except Exception as e:
-                    logger.error(f"Error saving to database: {e}")
-                    self.session.rollback()
+                
+                # Commit once per batch instead of once per item
+                if len(pending) >= self.batch_size:
+                    self._commit_batch(pending)
+            
+            self._commit_batch(pending)
             
             logger.info("Cleaning process completed")
             logger.info(f"New cleaned content items: {new_content_count}")
-            logger.info(f"Skipped duplicate content items: {duplicate_content_count}")
             logger.info(f"Content items marked as too short: {too_short_count}")
+            logger.info(f"Content items marked as garbled: {garbled_count}")
             
         except Exception as e:
             logger.error(f"An error occurred during processing: {e}")
@@ -148,10 +186,26 @@ class CleaningValidationAgent:
         finally:
             self.session.close()
 
-def main():
+def main(argv=None):
     """Main function to run the agent."""
+    # Setup argument parser
+    parser = argparse.ArgumentParser(description="Clean and validate scraped company content")
+    parser.add_argument("--min-words", type=int, default=MIN_WORD_COUNT, help="Minimum word count threshold")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Number of items to commit per transaction")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args(argv)
+    
+    # Setup logging; basicConfig leaves logging alone when the pipeline already configured it
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()]
+    )
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    
     try:
-        agent = CleaningValidationAgent(min_word_count=MIN_WORD_COUNT)
+        agent = CleaningValidationAgent(min_word_count=args.min_words, batch_size=args.batch_size)
         agent.process_scraped_content()
     except KeyboardInterrupt:
         logger.info("Process interrupted by user")
@@ -10,14 +10,21 @@ import json
 import os
 import argparse
 import requests
+import threading
 import time
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Callable
 from dotenv import load_dotenv
 from data.pipeline_db_config import SessionLocal
 from data.pipeline_db_models import SearchResult
 from data.company_repository import get_all_companies, get_company_by_id
+from data.llm_cache import make_cache_key, get_cached_response, store_cached_response
+from data.jsonutil import json_loads
 from logging_config import setup_logging
 
 # Setup logging
@@ -29,6 +36,61 @@ db_logger = loggers["database"]
 # Load environment variables
 load_dotenv()
 
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly to stay under a per-minute quota."""
+
+    def __init__(self, calls_per_minute: int):
+        self.interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0.0
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next call is allowed."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_call - now)
+            self._next_call = max(now, self._next_call) + self.interval
+        if delay:
+            time.sleep(delay)
+
+# Keep OpenAI calls under the account's requests-per-minute limit
+openai_rate_limiter = RateLimiter(int(os.environ.get("OPENAI_REQUESTS_PER_MINUTE", "500")))
+
+# Keep Google Custom Search calls under its per-minute quota, shared by all search threads
+google_rate_limiter = RateLimiter(int(os.environ.get("GOOGLE_REQUESTS_PER_MINUTE", "100")))
+
+# Companies are searched and analyzed concurrently; the work is almost entirely
+# waiting on Google and OpenAI, and the rate limiters above bound the API load
+SEARCH_COMPANY_WORKERS = int(os.environ.get("SEARCH_COMPANY_WORKERS", "4"))
+
+# Shared session for OpenAI calls. Rate-limited (429) and transient server errors
+# are retried with exponential backoff, honouring the Retry-After header; read
+# timeouts are not, so a slow completion is never sent (and billed) twice.
+openai_session = requests.Session()
+openai_session.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=5,
+    read=0,
+    backoff_factor=1,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=True
+)))
+
+# Shared session for Google Custom Search so paged requests reuse pooled
+# connections instead of opening a new TLS connection each time. A 429 means the
+# quota is tighter than configured, so back off as the server asks.
+google_session = requests.Session()
+google_session.mount("https://", HTTPAdapter(
+    pool_connections=SEARCH_COMPANY_WORKERS,
+    pool_maxsize=SEARCH_COMPANY_WORKERS,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True
+    )
+))
+
 def deduplicate_similar_content(results: List[Dict[str, Any]], threshold: float = 0.6) -> List[Dict[str, Any]]:
     """
     Remove duplicate content based on similarity across multiple dimensions.
@@ -60,7 +122,7 @@ def deduplicate_similar_content(results: List[Dict[str, Any]], threshold: float
     
     # For domains with multiple results, we'll be more aggressive with deduplication
     common_domains = {domain for domain, count in domain_counts.items() if count > 1}
-    logger.debug(f"Found {len(common_domains)} domains with multiple results")
+    logger.debug("Found %d domains with multiple results", len(common_domains))
     
     # Function to compute text similarity
     def compute_similarity(text1, text2):
@@ -91,7 +153,7 @@ def deduplicate_similar_content(results: List[Dict[str, Any]], threshold: float
                     if path_components:
                         normalized_url = f"{domain}:{'-'.join(path_components)}"
                         if normalized_url in seen_normalized_urls:
-                            logger.debug(f"Skipping URL pattern duplicate: {url}")
+                            logger.debug("Skipping URL pattern duplicate: %s", url)
                             continue
                         seen_normalized_urls.add(normalized_url)
         
@@ -102,20 +164,14 @@ def deduplicate_similar_content(results: List[Dict[str, Any]], threshold: float
         common_words = {"the", "a", "an", "and", "or", "but", "is", "in", "on", "at", "to", "for", "with", "by", "about", "as", "of"}
         words = [word for word in re.findall(r'\b\w+\b', content.lower()) if len(word) > 3 and word not in common_words]
         
-        # 2.2 Get most frequent/important words
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Sort by frequency and take top words
-        significant_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
-        significant_words = [word for word, _ in significant_words]
+        # 2.2 Get the most frequent/important words
+        significant_words = [word for word, _ in Counter(words).most_common(5)]
         
         # 2.3 Create content signature from significant words
         if significant_words:
             content_signature = "-".join(sorted(significant_words))
             if content_signature in seen_signatures:
-                logger.debug(f"Skipping content signature duplicate: {title[:30]}...")
+                logger.debug("Skipping content signature duplicate: %.30s...", title)
                 continue
             seen_signatures.add(content_signature)
         
@@ -133,7 +189,7 @@ def deduplicate_similar_content(results: List[Dict[str, Any]], threshold: float
             combined_sim = (title_sim * 0.7) + (snippet_sim * 0.3)
             
             if combined_sim > threshold:
-                logger.debug(f"Skipping content similarity duplicate ({combined_sim:.2f}): {title[:30]}...")
+                logger.debug("Skipping content similarity duplicate (%.2f): %.30s...", combined_sim, title)
                 is_duplicate = True
                 break
         
@@ -143,6 +199,23 @@ def deduplicate_similar_content(results: List[Dict[str, Any]], threshold: float
     logger.info(f"After content deduplication: {len(results)} results -> {len(unique_results)} unique results")
     return unique_results
 
+# Basic business categories and related terms that might be relevant to an industry
+BUSINESS_CATEGORIES = {
+    "energy": ["electricity", "gas", "renewable energy", "power", "utilities", "energy services"],
+    "technology": ["software", "hardware", "IT services", "digital solutions", "tech consulting"],
+    "retail": ["stores", "shopping", "consumer goods", "e-commerce", "merchandising"],
+    "finance": ["banking", "investments", "financial services", "insurance", "wealth management"],
+    "healthcare": ["medical services", "patient care", "pharmaceuticals", "health technology"],
+    "manufacturing": ["production", "industrial goods", "factories", "assembly", "materials"],
+    "telecommunications": ["networks", "connectivity", "internet services", "mobile", "communication"],
+    "food": ["restaurants", "food service", "catering", "food products", "beverages"],
+    "transportation": ["logistics", "shipping", "freight", "travel", "mobility"],
+    "construction": ["building", "infrastructure", "development", "engineering", "real estate"],
+    "agriculture": ["farming", "crops", "livestock", "agricultural products", "food production"],
+    "education": ["schools", "teaching", "training", "learning", "educational services"],
+    "entertainment": ["media", "events", "recreation", "content creation", "leisure activities"]
+}
+
 def enrich_company_info(company: Dict[str, Any]) -> Dict[str, Any]:
     """Enrich company information to provide better context for analysis."""
     # Make a copy of the company to avoid modifying the original
@@ -167,26 +240,9 @@ def enrich_company_info(company: Dict[str, Any]) -> Dict[str, Any]:
     if "location" not in enriched:
         enriched["location"] = ""
     
-    # Add basic business categories that might be relevant
-    business_categories = {
-        "energy": ["electricity", "gas", "renewable energy", "power", "utilities", "energy services"],
-        "technology": ["software", "hardware", "IT services", "digital solutions", "tech consulting"],
-        "retail": ["stores", "shopping", "consumer goods", "e-commerce", "merchandising"],
-        "finance": ["banking", "investments", "financial services", "insurance", "wealth management"],
-        "healthcare": ["medical services", "patient care", "pharmaceuticals", "health technology"],
-        "manufacturing": ["production", "industrial goods", "factories", "assembly", "materials"],
-        "telecommunications": ["networks", "connectivity", "internet services", "mobile", "communication"],
-        "food": ["restaurants", "food service", "catering", "food products", "beverages"],
-        "transportation": ["logistics", "shipping", "freight", "travel", "mobility"],
-        "construction": ["building", "infrastructure", "development", "engineering", "real estate"],
-        "agriculture": ["farming", "crops", "livestock", "agricultural products", "food production"],
-        "education": ["schools", "teaching", "training", "learning", "educational services"],
-        "entertainment": ["media", "events", "recreation", "content creation", "leisure activities"]
-    }
-    
     # If industry matches our categories, add related terms that might help with context
     industry_lower = enriched.get("industry", "").lower()
-    for category, terms in business_categories.items():
+    for category, terms in BUSINESS_CATEGORIES.items():
         if category in industry_lower:
             if "industry_terms" not in enriched:
                 enriched["industry_terms"] = []
@@ -207,30 +263,58 @@ def get_companies_from_db(specific_company: str = None) -> List[Dict[str, Any]]:
         logger.error(f"Error loading companies from database: {e}")
         return []
 
+# Stay under SQLite's default limit of 999 bound parameters per statement
+LINK_LOOKUP_CHUNK_SIZE = 900
+
+def query_existing_links(session, links: List[str]) -> set:
+    """Return the subset of links already stored as search results, using the given session."""
+    links = list(links)
+    existing_links = set()
+    for start in range(0, len(links), LINK_LOOKUP_CHUNK_SIZE):
+        chunk = links[start:start + LINK_LOOKUP_CHUNK_SIZE]
+        rows = session.query(SearchResult.link).filter(SearchResult.link.in_(chunk)).all()
+        existing_links.update(row.link for row in rows)
+    return existing_links
+
+def get_existing_links(links: List[str]) -> set:
+    """Return the subset of links that are already stored as search results."""
+    if not links:
+        return set()
+    
+    session = SessionLocal()
+    try:
+        return query_existing_links(session, links)
+    except Exception as e:
+        # Treat every result as new so the run continues without the shortcut
+        db_logger.error(f"Error checking existing search results: {e}")
+        return set()
+    finally:
+        session.close()
+
+# Common relative time patterns, compiled once, mapped to how far back they point
+# e.g., "5 days ago", "2 hours ago", "1 week ago", "3 months ago"
+RELATIVE_DATE_PATTERNS = (
+    (re.compile(r'(\d+)\s+day(?:s)?\s+ago', re.IGNORECASE), lambda x: timedelta(days=int(x))),
+    (re.compile(r'(\d+)\s+hour(?:s)?\s+ago', re.IGNORECASE), lambda x: timedelta(hours=int(x))),
+    (re.compile(r'(\d+)\s+minute(?:s)?\s+ago', re.IGNORECASE), lambda x: timedelta(minutes=int(x))),
+    (re.compile(r'(\d+)\s+week(?:s)?\s+ago', re.IGNORECASE), lambda x: timedelta(weeks=int(x))),
+    (re.compile(r'(\d+)\s+month(?:s)?\s+ago', re.IGNORECASE), lambda x: timedelta(days=int(x)*30)),  # Approximation
+    (re.compile(r'yesterday', re.IGNORECASE), lambda x: timedelta(days=1)),
+    (re.compile(r'today', re.IGNORECASE), lambda x: timedelta()),
+)
+
 def extract_published_date(snippet: str, current_date: datetime) -> Optional[str]:
     """
     Extract published date from a snippet containing relative time references.
     Returns a formatted date string (YYYY-MM-DD) or None if no date reference is found.
     """
-    # Look for common relative time patterns
-    # e.g., "5 days ago", "2 hours ago", "1 week ago", "3 months ago"
-    relative_date_patterns = [
-        (r'(\d+)\s+day(?:s)?\s+ago', lambda x: current_date - timedelta(days=int(x))),
-        (r'(\d+)\s+hour(?:s)?\s+ago', lambda x: current_date - timedelta(hours=int(x))),
-        (r'(\d+)\s+minute(?:s)?\s+ago', lambda x: current_date - timedelta(minutes=int(x))),
-        (r'(\d+)\s+week(?:s)?\s+ago', lambda x: current_date - timedelta(weeks=int(x))),
-        (r'(\d+)\s+month(?:s)?\s+ago', lambda x: current_date - timedelta(days=int(x)*30)),  # Approximation
-        (r'yesterday', lambda x: current_date - timedelta(days=1)),
-        (r'today', lambda x: current_date),
-    ]
-    
     # Try each pattern
-    for pattern, time_delta_func in relative_date_patterns:
-        match = re.search(pattern, snippet, re.IGNORECASE)
+    for pattern, time_delta_func in RELATIVE_DATE_PATTERNS:
+        match = pattern.search(snippet)
         if match:
             # If the pattern has a capture group, use it; otherwise None
             value = match.group(1) if len(match.groups()) > 0 else None
-            date_obj = time_delta_func(value)
+            date_obj = current_date - time_delta_func(value)
             return date_obj.strftime("%Y-%m-%d")
     
     # If no relative date pattern is found, return None
@@ -294,13 +378,14 @@ def search_company(
         # Perform the search
         logger.info(f"Searching for: {company_name} (last 7 days) - Page {page+1}/{pages_needed}")
         try:
-            response = requests.get(
+            google_rate_limiter.wait()
+            response = google_session.get(
                 "https://www.googleapis.com/customsearch/v1",
                 params=params,
                 timeout=30
             )
             response.raise_for_status()
-            search_data = response.json()
+            search_data = json_loads(response.content)
             
             # Add items from this page to our collection, avoiding duplicates
             items = search_data.get("items", [])
@@ -318,11 +403,7 @@ def search_company(
             if len(all_items) >= total_results or len(items) < 10:
                 break
                 
-            # Add a short delay between requests to be respectful of API limits
-            if page < pages_needed - 1:
-                time.sleep(0.5)
-                
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
             logger.error(f"Search API error on page {page+1}: {e}")
             # Continue with results we have so far instead of returning None
             break
@@ -357,8 +438,62 @@ def search_company(
     return results
 
 
-def create_analysis_prompt(company: Dict[str, Any], result: Dict[str, Any]) -> str:
-    """Create a well-structured prompt for analyzing a single search result."""
+# Static instructions for relevance analysis. Kept byte-identical across calls so
+# OpenAI can reuse the cached prompt prefix; per-result data goes in the user message.
+RELEVANCE_GUIDELINES = """TASK:
+Analyze each search result and determine its relevance to the company based on their specific business, industry, and services.
+
+IMPORTANT GUIDELINES:
+1. Consider any news about partnerships, collaborations, or business relationships as highly relevant
+2. Content about the company's core products, services, or operational areas is highly relevant
+3. Information about industry trends, regulations, or market developments that would affect this company is relevant
+4. Consider geographical relevance - local news in the company's area of operation may be relevant
+5. Business strategy, leadership changes, or company milestones are relevant
+6. Judge content in the context of THIS SPECIFIC COMPANY'S business model and services
+7. Remember that relevance can cross traditional industry boundaries - a restaurant chain partnering with an energy company on sustainability would be relevant to both
+8. BE CAREFUL: There might be other companies, products, or people with the same name - make sure the content is about the given company specifically
+9. If the result appears to be about a different entity with the same name (like a person, unrelated business, etc.), mark it as IRRELEVANT
+10. If the result appears to be about a job, job posting, "Join Our Team" or job application, mark it as IRRELEVANT
+
+Evaluate whether this content is:
+1. HIGHLY RELEVANT: Directly about the company's activities, partnerships, products, services or significant industry developments
+2. RELEVANT: Connected to the company's business interests, market position, or industry
+3. SOMEWHAT RELEVANT: Tangentially related to the company or its industry
+4. IRRELEVANT: Not connected to the company's business in any meaningful way
+"""
+
+RELEVANCE_ANALYSIS_FORMAT = """{
+  "relevance_category": "HIGHLY_RELEVANT|RELEVANT|SOMEWHAT_RELEVANT|IRRELEVANT",
+  "relevance_score": float,  // A value between 0.0 and 1.0 indicating relevance
+  "reasoning": "string",     // Brief explanation of your reasoning
+  "key_information": "string", // Key information about the company from this result
+  "content_type": "string"   // E.g., "partnership announcement", "product news", "industry trend", etc.
+}"""
+
+RELEVANCE_SYSTEM_PROMPT = f"""You are an AI expert at analyzing search results and determining their relevance to a specific company.
+
+You will receive the company's information followed by a single search result.
+
+{RELEVANCE_GUIDELINES}
+Respond with a JSON object in the following format:
+{RELEVANCE_ANALYSIS_FORMAT}
+"""
+
+# Variant used to analyze several search results for the same company in one call,
+# so the instructions are processed once per batch instead of once per result.
+BATCH_RELEVANCE_SYSTEM_PROMPT = f"""You are an AI expert at analyzing search results and determining their relevance to a specific company.
+
+You will receive the company's information followed by several numbered search results.
+
+{RELEVANCE_GUIDELINES}
+Evaluate every search result independently. Respond with a JSON object with a single
+"results" key holding an array with exactly one entry per search result, in the same
+order as the search results. Each entry has the following format:
+{RELEVANCE_ANALYSIS_FORMAT}
+"""
+
+def format_company_information(company: Dict[str, Any]) -> str:
+    """Format the company details shared by single and batched analysis prompts."""
     # Extract company information
     company_name = company.get("company_name", "")
     industry = company.get("industry", "")
@@ -366,12 +501,6 @@ def create_analysis_prompt(company: Dict[str, Any], result: Dict[str, Any]) -> s
     services = company.get("services", [])
     industry_terms = company.get("industry_terms", [])
     location = company.get("location", "")
-    
-    # Format search result
-    title = result.get("title", "")
-    link = result.get("link", "")
-    snippet = result.get("snippet", "")
-    published_date = result.get("published_date", "Unknown")
 
     # Add industry terms if available
     industry_context = ""
@@ -383,58 +512,61 @@ def create_analysis_prompt(company: Dict[str, Any], result: Dict[str, Any]) -> s
     if location:
         location_context = f"Location: {location}\n"
 
-    # Construct prompt
-    prompt = f"""You are an AI expert at analyzing search results and determining their relevance to a specific company.
-
-COMPANY INFORMATION:
+    return f"""COMPANY INFORMATION:
 Company Name: {company_name}
 Industry: {industry}
 Description: {description}
 Services Provided: {', '.join(services)}
 {location_context}
 {industry_context}
+"""
 
-SEARCH RESULT:
-Title: {title}
+def format_search_result(result: Dict[str, Any]) -> str:
+    """Format a single search result for an analysis prompt."""
+    title = result.get("title", "")
+    link = result.get("link", "")
+    snippet = result.get("snippet", "")
+    published_date = result.get("published_date", "Unknown")
+
+    return f"""Title: {title}
 Link: {link}
 Snippet: {snippet}
 Published Date: {published_date}
+"""
 
-TASK:
-Analyze this search result and determine its relevance to {company_name} based on their specific business, industry, and services.
+def create_analysis_prompt(company: Dict[str, Any], result: Dict[str, Any]) -> str:
+    """Create the user message for analyzing a single search result.
 
-IMPORTANT GUIDELINES:
-1. Consider any news about partnerships, collaborations, or business relationships as highly relevant
-2. Content about the company's core products, services, or operational areas is highly relevant
-3. Information about industry trends, regulations, or market developments that would affect this company is relevant
-4. Consider geographical relevance - local news in the company's area of operation may be relevant
-5. Business strategy, leadership changes, or company milestones are relevant
-6. Judge content in the context of THIS SPECIFIC COMPANY'S business model and services
-7. Remember that relevance can cross traditional industry boundaries - a restaurant chain partnering with an energy company on sustainability would be relevant to both
-8. BE CAREFUL: There might be other companies, products, or people with the same name - make sure the content is about {company_name} specifically
-9. If the result appears to be about a different entity with the same name (like a person, unrelated business, etc.), mark it as IRRELEVANT
-10. If the result appears to be about a job, job posting, "Join Our Team" or job application, mark it as IRRELEVANT
+    Only the company and search result details go here; the instructions
+    live in RELEVANCE_SYSTEM_PROMPT.
+    """
+    return f"""{format_company_information(company)}
+SEARCH RESULT:
+{format_search_result(result)}"""
 
-Evaluate whether this content is:
-1. HIGHLY RELEVANT: Directly about the company's activities, partnerships, products, services or significant industry developments
-2. RELEVANT: Connected to the company's business interests, market position, or industry
-3. SOMEWHAT RELEVANT: Tangentially related to the company or its industry
-4. IRRELEVANT: Not connected to the company's business in any meaningful way
+def create_batch_analysis_prompt(company: Dict[str, Any], results: List[Dict[str, Any]]) -> str:
+    """Create the user message for analyzing several search results in one call."""
+    search_results = "\n".join(
+        f"SEARCH RESULT {index}:\n{format_search_result(result)}"
+        for index, result in enumerate(results, 1)
+    )
+    return f"""{format_company_information(company)}
+There are {len(results)} search results. Return exactly {len(results)} entries in "results", in order.
 
-Respond with a JSON object in the following format:
-{{
-  "relevance_category": "HIGHLY_RELEVANT|RELEVANT|SOMEWHAT_RELEVANT|IRRELEVANT",
-  "relevance_score": float,  // A value between 0.0 and 1.0 indicating relevance
-  "reasoning": "string",     // Brief explanation of your reasoning
-  "key_information": "string", // Key information about the company from this result
-  "content_type": "string"   // E.g., "partnership announcement", "product news", "industry trend", etc.
-}}
-"""
-    
-    return prompt
+{search_results}"""
+
+def analyze_with_openai(
+    prompt: str,
+    api_key: str,
+    model: str = "gpt-4.1-nano",
+    system_prompt: str = RELEVANCE_SYSTEM_PROMPT,
+    max_tokens: int = 800,
+    validate: Optional[Callable[[Any], bool]] = None
+) -> Dict[str, Any]:
+    """Use OpenAI to analyze a search result.
 
-def analyze_with_openai(prompt: str, api_key: str, model: str = "gpt-4.1-nano") -> Dict[str, Any]:
-    """Use OpenAI to analyze a search result."""
+    If validate is given, a parsed response is only cached when it returns True.
+    """
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {api_key}"
@@ -442,29 +574,47 @@ def analyze_with_openai(prompt: str, api_key: str, model: str = "gpt-4.1-nano")
     
     payload = {
         "model": model,
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
         "temperature": 0.1,
-        "max_tokens": 800,
+        "max_tokens": max_tokens,
         "response_format": {"type": "json_object"}
     }
     
     try:
-        api_logger.info(f"Starting OpenAI analysis with model: {model}")
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        response_data = response.json()
-        content = response_data["choices"][0]["message"]["content"]
-        
+        # Reuse the stored response if this exact prompt was analyzed before
+        cache_key = make_cache_key(payload)
+        content = get_cached_response(cache_key) if cache_key else None
+
+        from_cache = content is not None
+
+        if from_cache:
+            api_logger.debug("Using cached OpenAI response")
+        else:
+            api_logger.info(f"Starting OpenAI analysis with model: {model}")
+            openai_rate_limiter.wait()
+            response = openai_session.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=30
+            )
+            response.raise_for_status()
+
+            response_data = json_loads(response.content)
+            content = response_data["choices"][0]["message"]["content"]
+
+            # Report how much of the prompt was served from OpenAI's prefix cache
+            usage = response_data.get("usage") or {}
+            cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+            api_logger.debug("Prompt tokens: %s, cached: %s", usage.get('prompt_tokens', 0), cached_tokens)
+
         # Extract JSON from the response
         try:
             # Try to parse the whole response as JSON
-            analysis = json.loads(content)
+            analysis = json_loads(content)
         except json.JSONDecodeError:
             # If that fails, try to extract JSON portion using string manipulation
             api_logger.warning("Full response was not valid JSON, attempting to extract JSON portion")
@@ -473,7 +623,7 @@ def analyze_with_openai(prompt: str, api_key: str, model: str = "gpt-4.1-nano")
             if json_start >= 0 and json_end > json_start:
                 json_str = content[json_start:json_end]
                 try:
-                    analysis = json.loads(json_str)
+                    analysis = json_loads(json_str)
                 except json.JSONDecodeError:
                     api_logger.error("Could not extract valid JSON from response")
                     return {"relevance_category": "UNKNOWN", "relevance_score": 0.0, 
@@ -482,6 +632,10 @@ def analyze_with_openai(prompt: str, api_key: str, model: str = "gpt-4.1-nano")
                 api_logger.error("No JSON object found in response")
                 return {"relevance_category": "UNKNOWN", "relevance_score": 0.0, 
                         "reasoning": "Error parsing response", "key_information": ""}
+
+        # Only cache responses that could be parsed and have the expected shape
+        if cache_key and not from_cache and (validate is None or validate(analysis)):
+            store_cached_response(cache_key, model, content)
                     
         return analysis
     
@@ -493,12 +647,47 @@ def analyze_with_openai(prompt: str, api_key: str, model: str = "gpt-4.1-nano")
     return {"relevance_category": "UNKNOWN", "relevance_score": 0.0, 
             "reasoning": "Error processing response", "key_information": ""}
 
+def batch_analyses_from_response(response: Any, count: int) -> Optional[List[Dict[str, Any]]]:
+    """Return the per-result analyses from a batch response, or None if it has the wrong shape."""
+    analyses = response.get("results") if isinstance(response, dict) else None
+    if not isinstance(analyses, list) or len(analyses) != count or not all(isinstance(a, dict) for a in analyses):
+        return None
+    return analyses
+
+def analyze_batch_with_openai(
+    company: Dict[str, Any],
+    batch: List[Dict[str, Any]],
+    api_key: str,
+    model: str = "gpt-4.1-nano"
+) -> Optional[List[Dict[str, Any]]]:
+    """Analyze several search results in a single OpenAI call.
+
+    Returns one analysis per result, in order, or None if the response
+    does not line up with the batch.
+    """
+    prompt = create_batch_analysis_prompt(company, batch)
+    response = analyze_with_openai(
+        prompt,
+        api_key,
+        model,
+        system_prompt=BATCH_RELEVANCE_SYSTEM_PROMPT,
+        max_tokens=800 * len(batch),
+        validate=lambda parsed: batch_analyses_from_response(parsed, len(batch)) is not None
+    )
+
+    analyses = batch_analyses_from_response(response, len(batch))
+    if analyses is None:
+        api_logger.warning(f"Batch analysis returned an unexpected shape for {len(batch)} results, analyzing individually")
+        return None
+
+    return analyses
+
 def analyze_search_results(
     company: Dict[str, Any], 
     results: Dict[str, Any],
     openai_api_key: str,
     openai_model: str = "gpt-4.1-nano",
-    batch_size: int = 3,  # How many results to analyze in parallel
+    batch_size: int = 3,  # How many results to analyze in a single API call
     min_relevance_score: float = 0.15  # Minimum relevance score to include
 ) -> Dict[str, Any]:
     """Analyze search results and categorize by relevance."""
@@ -524,10 +713,18 @@ def analyze_search_results(
     for i in range(0, len(search_results), batch_size):
         batch = search_results[i:i+batch_size]
         
-        for result in batch:
-            # Create prompt and analyze with OpenAI
-            prompt = create_analysis_prompt(company, result)
-            analysis = analyze_with_openai(prompt, openai_api_key, openai_model)
+        # Analyze the whole batch in one call; fall back to one call per result
+        batch_analyses = None
+        if len(batch) > 1:
+            batch_analyses = analyze_batch_with_openai(company, batch, openai_api_key, openai_model)
+        
+        for index, result in enumerate(batch):
+            if batch_analyses is not None:
+                analysis = batch_analyses[index]
+            else:
+                # Create prompt and analyze with OpenAI
+                prompt = create_analysis_prompt(company, result)
+                analysis = analyze_with_openai(prompt, openai_api_key, openai_model)
             
             # Add analysis data to the result
             result["analysis"] = analysis
@@ -539,10 +736,6 @@ def analyze_search_results(
             score = analysis.get("relevance_score", 0.0)
             published_date = result.get("published_date", "Unknown date")
             logger.info(f"  Analyzed: '{title}' - {category} ({score:.2f}) - Published: {published_date}")
-        
-        # Delay between batches to respect rate limits
-        if i + batch_size < len(search_results):
-            time.sleep(1.0)
     
     # Filter out low relevance results
     filtered_results = []
@@ -556,7 +749,7 @@ def analyze_search_results(
             filtered_results.append(result)
         else:
             title = result.get("title", "")[:30] + "..." if len(result.get("title", "")) > 30 else result.get("title", "")
-            logger.debug(f"Filtered out low relevance result: {title} (score: {score:.2f})")
+            logger.debug("Filtered out low relevance result: %s (score: %.2f)", title, score)
     
     # Categorize the filtered results
     for result in filtered_results:
@@ -677,6 +870,115 @@ def format_display_results(analyzed_results: Dict[str, Any], display_limit: int
     
     return output
 
+def search_and_analyze_company(
+    company: Dict[str, Any],
+    google_api_key: str,
+    google_cse_id: str,
+    openai_api_key: str,
+    openai_model: str,
+    results_per_company: int,
+    min_relevance_score: float
+) -> Optional[Dict[str, Any]]:
+    """Search for a single company and analyze the new results."""
+    # Enrich company information to provide better context
+    enriched_company = enrich_company_info(company)
+    
+    # 1. Search for the company
+    results = search_company(
+        enriched_company, 
+        google_api_key, 
+        google_cse_id,
+        total_results=results_per_company
+    )
+    
+    if not results:
+        return None
+    
+    # Add this line to deduplicate content generally
+    results["results"] = deduplicate_similar_content(results["results"])
+    
+    # Results already in the database would be skipped when saving, so
+    # don't spend OpenAI calls analyzing them again
+    existing_links = get_existing_links([r.get("link", "") for r in results["results"]])
+    if existing_links:
+        logger.info(f"Skipping analysis of {len(existing_links)} results already in the database")
+        results["results"] = [r for r in results["results"] if r.get("link", "") not in existing_links]
+    
+    # 2. Continue with analysis
+    return analyze_search_results(
+        enriched_company,
+        results,
+        openai_api_key,
+        openai_model,
+        min_relevance_score=min_relevance_score
+    )
+
+def save_analyzed_results(analyzed_results: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Save analyzed results to the database.
+    
+    Returns:
+        Tuple of (new results saved, duplicate results skipped)
+    """
+    session = SessionLocal()
+    try:
+        new_results_count = 0
+        duplicate_results_count = 0
+        
+        results_to_save = [
+            (company_results, category, result)
+            for company_results in analyzed_results
+            for category in ['highly_relevant', 'relevant', 'somewhat_relevant']
+            for result in company_results.get('categorized_results', {}).get(category, [])
+        ]
+        
+        # Look up which links are already stored with one chunked query
+        # instead of one query per result
+        existing_links = query_existing_links(session, {result['link'] for _, _, result in results_to_save})
+        
+        for company_results, category, result in results_to_save:
+            # Check if this result already exists in the database,
+            # or was already added earlier in this batch
+            if result['link'] in existing_links:
+                duplicate_results_count += 1
+                logger.debug("Skipping duplicate result: %.50s...", result['title'])
+                continue
+            
+            # Convert string date to Python date object if it exists
+            published_date_str = result.get('published_date')
+            published_date = None
+            if published_date_str:
+                try:
+                    published_date = datetime.strptime(published_date_str, '%Y-%m-%d').date()
+                except (ValueError, TypeError):
+                    logger.warning(f"Invalid date format for {published_date_str}, setting to None")
+            
+            sr = SearchResult(
+                company_id=company_results['company_id'],
+                company_name=company_results['company_name'],
+                title=result['title'],
+                link=result['link'],
+                snippet=result['snippet'],
+                published_date=published_date,
+                relevance_category=category,
+                relevance_score=result['analysis'].get('relevance_score', 0.0),
+                content_type=result['analysis'].get('content_type', ''),
+                key_information=result['analysis'].get('key_information', ''),
+                reasoning=result['analysis'].get('reasoning', ''),
+                raw_json=result
+            )
+            session.add(sr)
+            existing_links.add(result['link'])
+            new_results_count += 1
+        
+        session.commit()
+        return new_results_count, duplicate_results_count
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error saving results to database: {str(e)}")
+        raise
+    finally:
+        session.close()
+
 def intelligent_search_process(
     companies: List[Dict[str, Any]],
     openai_model: str = "gpt-4.1-nano",
@@ -689,7 +991,7 @@ def intelligent_search_process(
     # Get API credentials
     google_api_key = os.environ.get("GOOGLE_API_KEY")
     google_cse_id = os.environ.get("GOOGLE_SEARCH_ENGINE_ID")
-    openai_api_key = os.environ.get("1OPENAI_API_KEY")
+    openai_api_key = os.environ.get("OPENAI_API_KEY")
     
     if not google_api_key or not google_cse_id:
         logger.error("GOOGLE_API_KEY and GOOGLE_SEARCH_ENGINE_ID must be set in environment variables or .env file.")
@@ -699,51 +1001,52 @@ def intelligent_search_process(
         logger.error("OPENAI_API_KEY must be set for search result analysis.")
         return []
     
+    # Skip companies other than the specified one (when specific_company is provided)
+    if specific_company:
+        companies = [c for c in companies if c.get("company_name", "") == specific_company]
+    
     # Track results
     all_analyzed_results = []
+    new_results_count = 0
+    duplicate_results_count = 0
     
-    # Process each company
-    for company in companies:
-        company_name = company.get("company_name", "")
-        
-        # Skip if not the specified company (when specific_company is provided)
-        if specific_company and company_name != specific_company:
-            continue
-        
-        # Enrich company information to provide better context
-        enriched_company = enrich_company_info(company)
-        
-        # 1. Search for the company
-        results = search_company(
-            enriched_company, 
-            google_api_key, 
-            google_cse_id,
-            total_results=results_per_company
-        )
-        
-        if results:
-            # Add this line to deduplicate content generally
-            results["results"] = deduplicate_similar_content(results["results"])
-            
-            # 2. Continue with analysis
-            analyzed_results = analyze_search_results(
-                enriched_company,
-                results,
+    # Process the companies concurrently; map keeps the output in input order
+    with ThreadPoolExecutor(max_workers=SEARCH_COMPANY_WORKERS, thread_name_prefix="search-company") as executor:
+        company_results = executor.map(
+            lambda company: search_and_analyze_company(
+                company,
+                google_api_key,
+                google_cse_id,
                 openai_api_key,
                 openai_model,
-                min_relevance_score=min_relevance_score
-            )
-        
-        # 3. Display formatted results
-        formatted_results = format_display_results(analyzed_results, display_limit)
-        print(formatted_results)
-        
-        # 4. Save analyzed results
-        all_analyzed_results.append(analyzed_results)
+                results_per_company,
+                min_relevance_score
+            ),
+            companies
+        )
+        for analyzed_results in company_results:
+            if not analyzed_results:
+                continue
+            
+            # 3. Display formatted results
+            formatted_results = format_display_results(analyzed_results, display_limit)
+            print(formatted_results)
+            
+            # 4. Save analyzed results as each company finishes, so a failure
+            # later in the run doesn't lose the companies already searched
+            saved, duplicates = save_analyzed_results([analyzed_results])
+            new_results_count += saved
+            duplicate_results_count += duplicates
+            all_analyzed_results.append(analyzed_results)
+    
+    if all_analyzed_results:
+        logger.info(f"Saved {new_results_count} new results to database")
+        if duplicate_results_count > 0:
+            logger.info(f"Skipped {duplicate_results_count} duplicate results")
     
     return all_analyzed_results
 
-def main():
+def main(argv=None):
     """Main function for intelligent search."""
     try:
         logger.info("Starting intelligent search process")
@@ -754,7 +1057,7 @@ def main():
         parser.add_argument('--min-relevance', type=float, default=0.15, help='Minimum relevance score to keep result (0.0-1.0)')
         parser.add_argument('--company', type=str, help='Process only this specific company (by name)')
         parser.add_argument('--verbose', action='store_true', help='Enable verbose logging')
-        args = parser.parse_args()
+        args = parser.parse_args(argv)
         
         # Set logging level
         if args.verbose:
@@ -766,8 +1069,8 @@ def main():
             logger.error("No companies found in database. Exiting.")
             return
         
-        # Run the intelligent search process
-        analyzed_results = intelligent_search_process(
+        # Run the intelligent search process; results are saved as each company finishes
+        intelligent_search_process(
             companies,
             openai_model=args.model,
             display_limit=args.display_limit,
@@ -776,63 +1079,6 @@ def main():
             min_relevance_score=args.min_relevance
         )
         
-        # Save analyzed results to database
-        if analyzed_results:
-            session = SessionLocal()
-            try:
-                new_results_count = 0
-                duplicate_results_count = 0
-                
-                for company_results in analyzed_results:
-                    for category in ['highly_relevant', 'relevant', 'somewhat_relevant']:
-                        for result in company_results['categorized_results'][category]:
-                            # Check if this result already exists in the database
-                            existing_result = session.query(SearchResult).filter(
-                                SearchResult.link == result['link']
-                            ).first()
-                            
-                            if existing_result:
-                                duplicate_results_count += 1
-                                logger.debug(f"Skipping duplicate result: {result['title'][:50]}...")
-                                continue
-                            
-                            # Convert string date to Python date object if it exists
-                            published_date_str = result.get('published_date')
-                            published_date = None
-                            if published_date_str:
-                                try:
-                                    published_date = datetime.strptime(published_date_str, '%Y-%m-%d').date()
-                                except (ValueError, TypeError):
-                                    logger.warning(f"Invalid date format for {published_date_str}, setting to None")
-                            
-                            sr = SearchResult(
-                                company_id=company_results['company_id'],
-                                company_name=company_results['company_name'],
-                                title=result['title'],
-                                link=result['link'],
-                                snippet=result['snippet'],
-                                published_date=published_date,
-                                relevance_category=category,
-                                relevance_score=result['analysis'].get('relevance_score', 0.0),
-                                content_type=result['analysis'].get('content_type', ''),
-                                key_information=result['analysis'].get('key_information', ''),
-                                reasoning=result['analysis'].get('reasoning', ''),
-                                raw_json=result
-                            )
-                            session.add(sr)
-                            new_results_count += 1
-                
-                session.commit()
-                logger.info(f"Saved {new_results_count} new results to database")
-                if duplicate_results_count > 0:
-                    logger.info(f"Skipped {duplicate_results_count} duplicate results")
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error saving results to database: {str(e)}")
-                raise
-            finally:
-                session.close()
-
     except Exception as e:
         logger.error(f"Intelligent search process failed: {str(e)}")
         raise
@@ -6,9 +6,13 @@ project_root = str(Path(__file__).parent.parent)
 sys.path.append(project_root)
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 import os
 from typing import List, Dict, Any, Union
@@ -25,13 +29,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger("content_scraper")
 
+# Prefer the C-based lxml parser; fall back to the pure-Python parser if it is missing
+try:
+    import lxml
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Pages are truncated beyond this size; article text sits well within it
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Patterns used on every scraped page, compiled once
+WHITESPACE_RE = re.compile(r'\s+')
+AUTHOR_CLASS_RE = re.compile(r'author|byline', re.IGNORECASE)
+CONTENT_CLASS_RE = re.compile(r'article|post|content|entry', re.IGNORECASE)
+TAG_CLASS_RE = re.compile(r'tag|category|topic', re.IGNORECASE)
+DATE_PATTERNS = [
+    re.compile(r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}', re.IGNORECASE),
+    re.compile(r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}', re.IGNORECASE),
+    re.compile(r'\d{1,2}/\d{1,2}/\d{4}'),
+    re.compile(r'\d{4}-\d{2}-\d{2}')
+]
+
 class ContentScraper:
-    def __init__(self, user_agent=None, delay=2):
+    def __init__(self, user_agent=None, delay=2, max_workers=8):
         """Initialize the content scraper with custom settings.
         
         Args:
             user_agent: Custom user agent string (defaults to Chrome)
-            delay: Delay between requests in seconds
+            delay: Delay between requests to the same host in seconds
+            max_workers: Number of URLs fetched concurrently
         """
         self.user_agent = user_agent or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36"
         self.headers = {
@@ -43,6 +70,34 @@ class ContentScraper:
             "Upgrade-Insecure-Requests": "1"
         }
         self.delay = delay
+        self.max_workers = max_workers
+        
+        # One session for the whole run so connections to a host are kept alive
+        # and reused; the pool is sized to the number of concurrent workers
+        self.http_session = requests.Session()
+        self.http_session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        )
+        self.http_session.mount("http://", adapter)
+        self.http_session.mount("https://", adapter)
+        
+        # Earliest time the next request may be sent to each host
+        self._next_request_time = {}
+        self._host_lock = threading.Lock()
+        
+    def wait_for_host(self, host: str) -> None:
+        """Block until a request to the given host respects the per-host delay."""
+        with self._host_lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_request_time.get(host, now))
+            self._next_request_time[host] = request_time + self.delay
+        
+        # Sleep outside the lock so requests to other hosts are not held up
+        if request_time > now:
+            time.sleep(request_time - now)
         
     def get_relevant_urls_from_db(self, session) -> Dict[str, List[Dict[str, Any]]]:
         """Extract URLs from highly relevant and relevant categories from database.
@@ -77,13 +132,9 @@ class ContentScraper:
         if not text:
             return ""
             
-        # Replace multiple whitespace with single space
-        text = re.sub(r'\s+', ' ', text)
-        # Remove leading/trailing whitespace
-        text = text.strip()
-        # Normalize unicode characters
-        text = text.replace('\xa0', ' ')
-        return text
+        # Collapse all whitespace (including non-breaking spaces, which \s
+        # matches for str patterns) and trim in a single pass over the text
+        return WHITESPACE_RE.sub(' ', text).strip()
     
     def extract_content(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Extract structured content from a BeautifulSoup object."""
@@ -106,35 +157,11 @@ class ContentScraper:
             content["meta_description"] = self.clean_text(meta_desc["content"])
         
         # Try to find publication date
-        date_candidates = []
-        time_elements = soup.find_all("time")
-        for time in time_elements:
-            if "datetime" in time.attrs:
-                date_candidates.append(time["datetime"])
-            elif time.string:
-                date_candidates.append(time.string)
-        
-        meta_date = soup.find("meta", attrs={"property": "article:published_time"})
-        if meta_date and "content" in meta_date.attrs:
-            date_candidates.append(meta_date["content"])
-        
-        date_patterns = [
-            r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
-            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}',
-            r'\d{1,2}/\d{1,2}/\d{4}',
-            r'\d{4}-\d{2}-\d{2}'
-        ]
-        
-        for pattern in date_patterns:
-            matches = re.findall(pattern, str(soup), re.IGNORECASE)
-            date_candidates.extend(matches)
-        
-        if date_candidates:
-            content["publication_date"] = date_candidates[0]
+        content["publication_date"] = self.extract_publication_date(soup)
         
         # Extract author information
         author_candidates = []
-        author_elements = soup.find_all(["a", "span", "div"], class_=re.compile(r'author|byline', re.IGNORECASE))
+        author_elements = soup.find_all(["a", "span", "div"], class_=AUTHOR_CLASS_RE)
         for element in author_elements:
             author_text = self.clean_text(element.get_text())
             if author_text and len(author_text) < 100:
@@ -148,9 +175,6 @@ class ContentScraper:
             content["author"] = author_candidates[0]
         
         # Extract main content
-        main_content_containers = soup.find_all(["article", "main", "div"], 
-                                              class_=re.compile(r'article|post|content|entry', re.IGNORECASE))
-        
         all_paragraphs = soup.find_all("p")
         
         paragraphs_text = []
@@ -162,6 +186,9 @@ class ContentScraper:
         if paragraphs_text:
             content["main_content"] = "\n\n".join(paragraphs_text)
         else:
+            # Only search for content containers when the page has no usable paragraphs
+            main_content_containers = soup.find_all(["article", "main", "div"], 
+                                                  class_=CONTENT_CLASS_RE)
             for container in main_content_containers:
                 container_text = self.clean_text(container.get_text())
                 if container_text and len(container_text) > 200:
@@ -170,7 +197,7 @@ class ContentScraper:
         
         # Extract tags/categories
         tag_elements = soup.find_all(["a", "span", "li"], 
-                                  class_=re.compile(r'tag|category|topic', re.IGNORECASE))
+                                  class_=TAG_CLASS_RE)
         for tag in tag_elements:
             tag_text = self.clean_text(tag.get_text())
             if tag_text and len(tag_text) < 30:
@@ -178,6 +205,36 @@ class ContentScraper:
         
         return content
     
+    def extract_publication_date(self, soup: BeautifulSoup) -> str:
+        """Return the first publication date candidate found in the page.
+        
+        Candidates are tried in priority order (<time> elements, then the
+        article:published_time meta tag, then date patterns in the page
+        source) and the search stops at the first hit.
+        """
+        # Walk <time> and <meta> tags in one pass; a <time> always wins over the meta tag
+        meta_date = ""
+        for element in soup.find_all(["time", "meta"]):
+            if element.name == "time":
+                if "datetime" in element.attrs:
+                    return element["datetime"]
+                if element.string:
+                    return element.string
+            elif not meta_date and element.get("property") == "article:published_time" and "content" in element.attrs:
+                meta_date = element["content"]
+        
+        if meta_date:
+            return meta_date
+        
+        # Only serialize the page when no structured date was found
+        page_text = str(soup)
+        for pattern in DATE_PATTERNS:
+            match = pattern.search(page_text)
+            if match:
+                return match.group(0)
+        
+        return ""
+    
     def scrape_url(self, url: str) -> Dict[str, Any]:
         """Scrape content from a given URL."""
         if not url:
@@ -190,17 +247,26 @@ class ContentScraper:
                 "scrape_time": datetime.now()
             }
             
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
+            self.wait_for_host(result["domain"])
             
-            result["content_type"] = response.headers.get("Content-Type", "")
-            result["encoding"] = response.encoding
-            
-            if "text/html" not in result["content_type"]:
-                result["error"] = f"Not HTML content: {result['content_type']}"
-                return result
+            # Stream the response so the headers can be checked before the body is
+            # downloaded, and never read more than MAX_PAGE_BYTES of it
+            with self.http_session.get(url, timeout=(5, 25), stream=True) as response:
+                response.raise_for_status()
+                
+                result["content_type"] = response.headers.get("Content-Type", "")
+                result["encoding"] = response.encoding
+                
+                if "text/html" not in result["content_type"]:
+                    result["error"] = f"Not HTML content: {result['content_type']}"
+                    return result
+                
+                body = response.raw.read(MAX_PAGE_BYTES, decode_content=True)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Hand the raw bytes to the parser so it detects the encoding from the
+            # BOM or <meta charset>; only trust requests' guess if the server sent a charset
+            declared_encoding = response.encoding if "charset" in result["content_type"].lower() else None
+            soup = BeautifulSoup(body, HTML_PARSER, from_encoding=declared_encoding)
             extracted_content = self.extract_content(soup)
             result.update(extracted_content)
             
@@ -228,67 +294,93 @@ class ContentScraper:
         # Extract relevant URLs for each company
         company_urls = self.get_relevant_urls_from_db(session)
         
-        # Scrape each URL for each company
-        for company_name, urls_list in company_urls.items():
-            logger.info(f"Scraping {len(urls_list)} URLs for {company_name}")
-            
-            new_content_count = 0
-            duplicate_content_count = 0
-            
-            for url_data in urls_list:
-                url = url_data.get("url", "")
-                search_result_id = url_data.get("search_result_id")
-                if not url or not search_result_id:
-                    continue
-                
-                # Check if content for this search result already exists
-                existing_content = session.query(ScrapedContent).filter(
-                    ScrapedContent.search_result_id == search_result_id
-                ).first()
-                
-                if existing_content:
-                    duplicate_content_count += 1
-                    logger.debug(f"Skipping duplicate content for URL: {url}")
-                    continue
+        # URLs are fetched concurrently; the per-host delay in scrape_url keeps
+        # each site from being hit faster than before. The database session is
+        # only used from this thread.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Scrape each URL for each company
+            for company_name, urls_list in company_urls.items():
+                logger.info(f"Scraping {len(urls_list)} URLs for {company_name}")
                 
-                logger.info(f"  Scraping: {url}")
+                duplicate_content_count = 0
                 
-                # Scrape the URL
-                scraped_data = self.scrape_url(url)
+                to_scrape = []
+                for url_data in urls_list:
+                    url = url_data.get("url", "")
+                    search_result_id = url_data.get("search_result_id")
+                    if not url or not search_result_id:
+                        continue
+                    
+                    # Check if content for this search result already exists
+                    existing_content = session.query(ScrapedContent).filter(
+                        ScrapedContent.search_result_id == search_result_id
+                    ).first()
+                    
+                    if existing_content:
+                        duplicate_content_count += 1
+                        logger.debug("Skipping duplicate content for URL: %s", url)
+                        continue
+                    
+                    logger.debug("  Scraping: %s", url)
+                    to_scrape.append((url, search_result_id))
                 
-                # Create ScrapedContent record
-                scraped_content = ScrapedContent(
-                    search_result_id=search_result_id,
-                    domain=scraped_data.get("domain", ""),
-                    main_content=scraped_data.get("main_content", ""),
-                    status="new"
-                )
+                # Scrape the URLs in parallel, collecting results in submission order
+                scraped_pages = executor.map(self.scrape_url, [url for url, _ in to_scrape])
                 
-                # Add to session
-                session.add(scraped_content)
-                new_content_count += 1
+                # Collect ScrapedContent rows for a single bulk insert
+                rows = [
+                    {
+                        "search_result_id": search_result_id,
+                        "domain": scraped_data.get("domain", ""),
+                        "main_content": scraped_data.get("main_content", ""),
+                        "status": "new"
+                    }
+                    for (_, search_result_id), scraped_data in zip(to_scrape, scraped_pages)
+                ]
                 
-                # Delay between requests
-                time.sleep(self.delay)
-            
-            # Commit after each company to avoid large transactions
-            try:
-                session.commit()
+                # Commit after each company to avoid large transactions
+                new_content_count = self.save_scraped_rows(session, rows, company_name)
                 logger.info(f"  Saved {new_content_count} new scraped content items for {company_name} to database")
                 if duplicate_content_count > 0:
                     logger.info(f"  Skipped {duplicate_content_count} duplicate content items for {company_name}")
+    
+    def save_scraped_rows(self, session, rows: List[Dict[str, Any]], company_name: str) -> int:
+        """Insert ScrapedContent rows in one batch, falling back to row-by-row inserts on failure.
+        
+        Returns:
+            Number of rows saved
+        """
+        if not rows:
+            return 0
+        
+        try:
+            session.bulk_insert_mappings(ScrapedContent, rows)
+            session.commit()
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error saving to database for {company_name}, retrying row by row: {e}")
+            session.rollback()
+        
+        # Save what we can so a single bad row doesn't lose the whole company
+        saved_count = 0
+        for row in rows:
+            try:
+                session.add(ScrapedContent(**row))
+                session.commit()
+                saved_count += 1
             except Exception as e:
-                logger.error(f"Error saving to database for {company_name}: {e}")
+                logger.error(f"Error saving scraped content for search result {row['search_result_id']}: {e}")
                 session.rollback()
+        return saved_count
 
 
-def scrape_relevant_content():
+def scrape_relevant_content(delay=3, max_workers=8):
     """Main function for scraping relevant content from database."""
+    # Initialize the content scraper; the delay applies per host, so
+    # different sites are still fetched in parallel
+    scraper = ContentScraper(delay=delay, max_workers=max_workers)
     session = SessionLocal()
     try:
-        # Initialize the content scraper
-        scraper = ContentScraper(delay=3)  # 3-second delay between requests
-        
         # Scrape all relevant content and save to database
         scraper.scrape_company_data(session)
         
@@ -298,16 +390,23 @@ def scrape_relevant_content():
         session.rollback()
     finally:
         session.close()
+        scraper.http_session.close()
 
-
-if __name__ == "__main__":
+def main(argv=None):
+    """Parse command line arguments and run the scraping process."""
     import argparse
     
     parser = argparse.ArgumentParser(description='Scrape content from relevant URLs in database')
     parser.add_argument('--delay', type=int, default=3, 
-                        help='Delay between requests in seconds')
+                        help='Delay between requests to the same host in seconds')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Number of URLs fetched concurrently')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Run the scraping process
-    scrape_relevant_content()
\ No newline at end of file
+    scrape_relevant_content(delay=args.delay, max_workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -8,7 +8,20 @@ from typing import List, Dict, Any
 
 def get_db_connection():
     """Create a database connection."""
-    return sqlite3.connect('data/database/companies.db')
+    conn = sqlite3.connect('data/database/companies.db')
+    # WAL lets the search agent read companies while they are being edited, and
+    # synchronous=NORMAL skips the fsync WAL doesn't need on every commit
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+def _row_to_company(columns: List[str], row: tuple) -> Dict[str, Any]:
+    """Convert a companies row to a dictionary."""
+    company_dict = dict(zip(columns, row))
+    # Convert services string back to list
+    company_dict['services'] = company_dict['services'].split(',')
+    return company_dict
 
 def get_all_companies() -> List[Dict[str, Any]]:
     """Retrieve all companies from the database."""
@@ -16,16 +29,10 @@ def get_all_companies() -> List[Dict[str, Any]]:
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM companies')
-    companies = cursor.fetchall()
     
-    # Convert to list of dictionaries
+    # Convert to list of dictionaries in one pass over the cursor
     columns = [description[0] for description in cursor.description]
-    result = []
-    for company in companies:
-        company_dict = dict(zip(columns, company))
-        # Convert services string back to list
-        company_dict['services'] = company_dict['services'].split(',')
-        result.append(company_dict)
+    result = [_row_to_company(columns, company) for company in cursor]
     
     conn.close()
     return result
@@ -40,8 +47,7 @@ def get_company_by_id(company_id: str) -> Dict[str, Any]:
     
     if company:
         columns = [description[0] for description in cursor.description]
-        company_dict = dict(zip(columns, company))
-        company_dict['services'] = company_dict['services'].split(',')
+        company_dict = _row_to_company(columns, company)
     else:
         company_dict = None
     
@@ -1,20 +1,8 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from data.pipeline_db_config import SQLITE_URL, engine, SessionLocal, drop_all_tables
 from data.pipeline_db_models import Base
 
-# SQLite will create object_store.db in your working dir
-SQLITE_URL = "sqlite:///data/database/object_store.db"
-
-engine = create_engine(
-    SQLITE_URL, 
-    connect_args={"check_same_thread": False},  # for SQLite + threads
-    echo=False
-)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-
-def drop_all_tables():
-    """Drop all tables in the database."""
-    Base.metadata.drop_all(bind=engine)
+# Shares the engine and session factory from pipeline_db_config so the
+# object store only ever has one connection pool per process
 
 def init_db():
     """Create all tables in the database."""
@@ -22,4 +10,3 @@ def init_db():
     drop_all_tables()
     # Then create new tables
     Base.metadata.create_all(bind=engine)
-
@@ -7,166 +7,182 @@ import sqlite3
 import os
 import time
 import datetime
+from contextlib import ExitStack, closing
+
+# Database locations, relative to the project root the pipeline runs from
+PIPELINE_DB_PATH = 'data/database/object_store.db'
+FRONTEND_DB_PATH = 'data/database/to_frontend.db'
+
+# Rows are copied in chunks of this size so memory stays flat as the pipeline grows
+SYNC_BATCH_SIZE = 1000
+
+# Joined view of the pipeline tables that the frontend consumes
+PIPELINE_ROWS_QUERY = '''
+SELECT 
+    sr.id,
+    sr.company_name,
+    sr.title,
+    sr.link,
+    sr.published_date,
+    sr.content_type,
+    cc.cleaned_text,
+    ar.sentiment_score,
+    ar.sentiment_label,
+    ar.analysis_text,
+    ar.summary
+FROM search_results sr
+LEFT JOIN scraped_content sc ON sr.id = sc.search_result_id
+LEFT JOIN cleaned_content cc ON sc.id = cc.scraped_content_id
+LEFT JOIN analysis_results ar ON cc.id = ar.cleaned_content_id
+'''
+
+def iter_pipeline_rows(c_pipeline, current_time, batch_size=SYNC_BATCH_SIZE):
+    """Yield batches of complete pipeline rows, each stamped with current_time"""
+    c_pipeline.execute(PIPELINE_ROWS_QUERY)
+    while True:
+        data = c_pipeline.fetchmany(batch_size)
+        if not data:
+            break
+        # Skip rows with NULL values and add timestamp
+        rows = [row + (current_time,) for row in data if None not in row]
+        if rows:
+            yield rows
+
+def connect_frontend_db():
+    """Open the frontend database in WAL mode so the UI can keep reading during a sync"""
+    conn_frontend = sqlite3.connect(FRONTEND_DB_PATH, timeout=5)
+    # journal_mode is stored in the file; synchronous=NORMAL applies per connection
+    # and skips the fsync WAL doesn't need on every commit
+    conn_frontend.execute('PRAGMA journal_mode=WAL')
+    conn_frontend.execute('PRAGMA synchronous=NORMAL')
+    return conn_frontend
+
+def ensure_frontend_indexes(conn_frontend):
+    """Create any missing frontend_data indexes, including on databases built before they existed"""
+    # The dashboard and API always filter mentions by company
+    conn_frontend.execute('CREATE INDEX IF NOT EXISTS idx_frontend_data_company_name ON frontend_data (company_name)')
 
 def create_frontend_db():
     """Create the frontend database with initial data from object_store.db"""
     
-    # Connect to pipeline database
-    conn_pipeline = sqlite3.connect('data/database/object_store.db')
-    c_pipeline = conn_pipeline.cursor()
-    
-    # Create or recreate frontend database
-    if os.path.exists('data/database/to_frontend.db'):
-        os.remove('data/database/to_frontend.db')  # Remove existing file to start fresh
-    conn_frontend = sqlite3.connect('data/database/to_frontend.db')
-    c_frontend = conn_frontend.cursor()
-    
-    # Create the frontend table
-    c_frontend.execute('''
-    CREATE TABLE frontend_data (
-        id INTEGER PRIMARY KEY,
-        company_name TEXT,
-        title TEXT,
-        url TEXT,
-        published_date TEXT,
-        content_type TEXT,
-        cleaned_text TEXT,
-        sentiment_score REAL,
-        sentiment_label TEXT,
-        analysis_text TEXT,
-        summary TEXT,
-        last_updated TEXT
-    )
-    ''')
-    
-    # Initial data load from object_store.db to to_frontend.db
-    c_pipeline.execute('''
-    SELECT 
-        sr.id,
-        sr.company_name,
-        sr.title,
-        sr.link,
-        sr.published_date,
-        sr.content_type,
-        cc.cleaned_text,
-        ar.sentiment_score,
-        ar.sentiment_label,
-        ar.analysis_text,
-        ar.summary
-    FROM search_results sr
-    LEFT JOIN scraped_content sc ON sr.id = sc.search_result_id
-    LEFT JOIN cleaned_content cc ON sc.id = cc.scraped_content_id
-    LEFT JOIN analysis_results ar ON cc.id = ar.cleaned_content_id
-    ''')
-    
-    data = c_pipeline.fetchall()
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Filter out rows with NULL values and add timestamp
-    filtered_data = []
-    for row in data:
-        if None not in row:  # Check if any value in the row is NULL
-            filtered_data.append(row + (current_time,))
-    
-    # Insert filtered data into frontend database
-    if filtered_data:  # Only execute if there's data to insert
-        c_frontend.executemany('''
-        INSERT INTO frontend_data 
-        (id, company_name, title, url, published_date, content_type, 
-         cleaned_text, sentiment_score, sentiment_label, analysis_text, summary, last_updated)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', filtered_data)
-    
-    # Commit changes and close connections
-    conn_frontend.commit()
-    conn_frontend.close()
-    conn_pipeline.close()
+    # Both connections are closed on exit, even if the initial load fails
+    with ExitStack() as stack:
+        # Connect to pipeline database
+        conn_pipeline = stack.enter_context(closing(sqlite3.connect(PIPELINE_DB_PATH)))
+        c_pipeline = conn_pipeline.cursor()
+        
+        # Create or recreate frontend database
+        # Remove existing file to start fresh, along with any WAL files left beside it
+        for path in (FRONTEND_DB_PATH, FRONTEND_DB_PATH + '-wal', FRONTEND_DB_PATH + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        conn_frontend = stack.enter_context(closing(connect_frontend_db()))
+        c_frontend = conn_frontend.cursor()
+        
+        # Create the frontend table
+        c_frontend.execute('''
+        CREATE TABLE frontend_data (
+            id INTEGER PRIMARY KEY,
+            company_name TEXT,
+            title TEXT,
+            url TEXT,
+            published_date TEXT,
+            content_type TEXT,
+            cleaned_text TEXT,
+            sentiment_score REAL,
+            sentiment_label TEXT,
+            analysis_text TEXT,
+            summary TEXT,
+            last_updated TEXT
+        )
+        ''')
+        
+        ensure_frontend_indexes(conn_frontend)
+        
+        # Initial data load from object_store.db to to_frontend.db
+        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Insert filtered data into frontend database
+        for rows in iter_pipeline_rows(c_pipeline, current_time):
+            c_frontend.executemany('''
+            INSERT INTO frontend_data 
+            (id, company_name, title, url, published_date, content_type, 
+             cleaned_text, sentiment_score, sentiment_label, analysis_text, summary, last_updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        
+        # Commit changes
+        conn_frontend.commit()
     
     print("Frontend database created successfully with initial data.")
 
 def sync_databases():
     """Synchronize data from object_store.db to to_frontend.db"""
     
-    # Connect to both databases
-    conn_pipeline = sqlite3.connect('data/database/object_store.db')
-    conn_frontend = sqlite3.connect('data/database/to_frontend.db')
-    
-    # Create cursor objects
-    c_pipeline = conn_pipeline.cursor()
-    c_frontend = conn_frontend.cursor()
-    
-    # Get the latest data from pipeline
-    c_pipeline.execute('''
-    SELECT 
-        sr.id,
-        sr.company_name,
-        sr.title,
-        sr.link,
-        sr.published_date,
-        sr.content_type,
-        cc.cleaned_text,
-        ar.sentiment_score,
-        ar.sentiment_label,
-        ar.analysis_text,
-        ar.summary
-    FROM search_results sr
-    LEFT JOIN scraped_content sc ON sr.id = sc.search_result_id
-    LEFT JOIN cleaned_content cc ON sc.id = cc.scraped_content_id
-    LEFT JOIN analysis_results ar ON cc.id = ar.cleaned_content_id
-    ''')
-    
-    data = c_pipeline.fetchall()
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # For each row, update or insert into frontend database
-    for row in data:
-        if None in row:  # Skip rows with NULL values
-            continue
-            
-        id_val = row[0]
+    # Both connections are closed on exit; an aborted sync leaves the frontend untouched
+    with ExitStack() as stack:
+        # Connect to both databases
+        conn_pipeline = stack.enter_context(closing(sqlite3.connect(PIPELINE_DB_PATH)))
+        conn_frontend = stack.enter_context(closing(connect_frontend_db()))
         
-        # Check if the record exists
-        c_frontend.execute("SELECT id FROM frontend_data WHERE id = ?", (id_val,))
-        exists = c_frontend.fetchone()
+        # Create cursor objects
+        c_pipeline = conn_pipeline.cursor()
+        c_frontend = conn_frontend.cursor()
         
-        if exists:
-            # Update existing record
-            c_frontend.execute('''
-            UPDATE frontend_data 
-            SET 
-                company_name = ?,
-                title = ?,
-                url = ?,
-                published_date = ?,
-                content_type = ?,
-                cleaned_text = ?,
-                sentiment_score = ?,
-                sentiment_label = ?,
-                analysis_text = ?,
-                summary = ?,
-                last_updated = ?
-            WHERE id = ?
-            ''', row[1:] + (current_time, id_val))
-        else:
-            # Insert new record
-            c_frontend.execute('''
+        # Frontend databases created before an index was added get it on their next sync
+        ensure_frontend_indexes(conn_frontend)
+        
+        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Get the latest data from pipeline. New records are inserted and existing
+        # ones updated in a single statement; SQLite resolves the conflict on the
+        # primary key, so no existence check is needed
+        for rows in iter_pipeline_rows(c_pipeline, current_time):
+            c_frontend.executemany('''
             INSERT INTO frontend_data 
             (id, company_name, title, url, published_date, content_type, 
              cleaned_text, sentiment_score, sentiment_label, analysis_text, summary, last_updated)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', row + (current_time,))
-    
-    # Commit changes and close connections
-    conn_frontend.commit()
-    conn_pipeline.close()
-    conn_frontend.close()
+            ON CONFLICT(id) DO UPDATE SET 
+                company_name = excluded.company_name,
+                title = excluded.title,
+                url = excluded.url,
+                published_date = excluded.published_date,
+                content_type = excluded.content_type,
+                cleaned_text = excluded.cleaned_text,
+                sentiment_score = excluded.sentiment_score,
+                sentiment_label = excluded.sentiment_label,
+                analysis_text = excluded.analysis_text,
+                summary = excluded.summary,
+                last_updated = excluded.last_updated
+            ''', rows)
+        
+        # Commit changes
+        conn_frontend.commit()
     
     print(f"Synchronization completed at {current_time}")
 
+def get_database_signature(db_path):
+    """Return the modification time and size of a SQLite database and its WAL file"""
+    signature = []
+    for path in (db_path, db_path + '-wal'):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        else:
+            signature.append(None)
+    return tuple(signature)
+
 def scheduled_sync(interval_seconds=300):
-    """Run a scheduled sync at regular intervals"""
+    """Run a scheduled sync at regular intervals, skipping runs when nothing changed"""
+    last_signature = None
     while True:
-        sync_databases()
+        signature = get_database_signature(PIPELINE_DB_PATH)
+        if signature != last_signature:
+            sync_databases()
+            last_signature = signature
+        else:
+            print("Pipeline database unchanged, skipping sync")
         print(f"Next sync in {interval_seconds} seconds")
         time.sleep(interval_seconds)
 
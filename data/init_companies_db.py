@@ -3,9 +3,16 @@ Setup module for the companies database.
 Initializes the companies database schema and populates it with initial data from companies.json.
 """
 
+import sys
 import sqlite3
-import json
 import os
+from pathlib import Path
+
+# Add the project root directory to Python path when run as a script
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+from data.jsonutil import json_loads
 
 def setup_database():
     # Create database connection
@@ -25,26 +32,27 @@ def setup_database():
     ''')
 
     # Read the JSON file
-    with open('companies.json', 'r') as f:
-        companies = json.load(f)
-
-    # Insert data from JSON into database
-    for company in companies:
-        # Convert services list to comma-separated string
-        services_str = ','.join(company['services'])
-        
-        cursor.execute('''
-        INSERT OR REPLACE INTO companies 
-        (company_id, company_name, industry, location, description, services)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
+    with open('companies.json', 'rb') as f:
+        companies = json_loads(f.read())
+
+    # Insert data from JSON into database with a single executemany, converting
+    # each services list to a comma-separated string
+    rows = [
+        (
             company['company_id'],
             company['company_name'],
             company['industry'],
             company['location'],
             company['description'],
-            services_str
-        ))
+            ','.join(company['services'])
+        )
+        for company in companies
+    ]
+    cursor.executemany('''
+    INSERT OR REPLACE INTO companies 
+    (company_id, company_name, industry, location, description, services)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', rows)
 
     # Commit changes and close connection
     conn.commit()
@@ -0,0 +1,13 @@
+"""
+Shared JSON helpers for the pipeline modules.
+"""
+
+import json
+
+# orjson is a faster drop-in for parsing; its JSONDecodeError subclasses json's,
+# so callers can keep catching json.JSONDecodeError. Fall back to the standard library.
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
@@ -0,0 +1,59 @@
+"""
+Repository module for cached LLM responses.
+Stores OpenAI responses in the llm_cache table of object_store.db so that
+identical prompts are answered from the database instead of the API.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from data.pipeline_db_config import SessionLocal
+from data.pipeline_db_models import LLMCacheEntry
+
+# Responses sampled above this temperature are not deterministic enough to reuse
+MAX_CACHEABLE_TEMPERATURE = 0.1
+
+def make_cache_key(payload: Dict[str, Any]) -> Optional[str]:
+    """Build a cache key for a chat completion payload.
+
+    Returns None when the payload should not be cached.
+    """
+    if payload.get("temperature", 1.0) > MAX_CACHEABLE_TEMPERATURE:
+        return None
+
+    # Normalize whitespace in the messages so indentation changes don't miss the cache
+    normalized = dict(payload)
+    normalized["messages"] = [
+        {**message, "content": " ".join(message.get("content", "").split())}
+        for message in payload.get("messages", [])
+    ]
+    serialized = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+def get_cached_response(cache_key: str) -> Optional[str]:
+    """Return the cached response for the given key, if any."""
+    session = SessionLocal()
+    try:
+        entry = session.query(LLMCacheEntry.response).filter(
+            LLMCacheEntry.prompt_hash == cache_key
+        ).first()
+        return entry[0] if entry else None
+    except Exception:
+        # The cache is best-effort; a missing table just means a cache miss
+        return None
+    finally:
+        session.close()
+
+def store_cached_response(cache_key: str, model: str, response: str) -> bool:
+    """Store a response in the cache. Returns False if it could not be saved."""
+    session = SessionLocal()
+    try:
+        session.add(LLMCacheEntry(prompt_hash=cache_key, model=model, response=response))
+        session.commit()
+        return True
+    except Exception:
+        session.rollback()
+        return False
+    finally:
+        session.close()
@@ -21,7 +21,7 @@ class SearchResult(Base):
     link             = Column(String, unique=True, index=True)
     snippet          = Column(Text)
     published_date   = Column(Date)
-    relevance_category = Column(String)
+    relevance_category = Column(String, index=True)
     relevance_score   = Column(Float)
     content_type     = Column(String)
     key_information  = Column(Text)
@@ -39,7 +39,7 @@ class ScrapedContent(Base):
     domain           = Column(String)
     scrape_time      = Column(DateTime(timezone=True), server_default=func.now())
     main_content     = Column(Text)
-    status           = Column(String, default="new")
+    status           = Column(String, default="new", index=True)
     
     # Relationships
     search_result = relationship("SearchResult", back_populates="scraped_contents")
@@ -69,3 +69,11 @@ class AnalysisResult(Base):
     
     # Relationships
     cleaned_content = relationship("CleanedContent", back_populates="analysis_results")
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+    id                   = Column(Integer, primary_key=True, index=True)
+    prompt_hash          = Column(String, unique=True, index=True)
+    model                = Column(String)
+    response             = Column(Text)
+    created_at           = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,29 +1,53 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 
+# Directory the pipeline log files are written to
+LOG_DIR = "logs"
+
+# Background listener that writes queued log records; started once per process
+_listener = None
+
 def setup_logging(log_level=logging.INFO):
     """Configure logging for the entire application."""
-    # Create logs directory if it doesn't exist
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-
-    # Generate log filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f"pipeline_{timestamp}.log")
-
-    # Configure root logger
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)  # Use stdout with proper encoding
-        ]
-    )
+    global _listener
+
+    root_logger = logging.getLogger()
+
+    # Like basicConfig, leave an already configured root logger alone
+    if _listener is None and not root_logger.handlers:
+        # Create logs directory if it doesn't exist
+        os.makedirs(LOG_DIR, exist_ok=True)
+
+        # Generate log filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_file = os.path.join(LOG_DIR, f"pipeline_{timestamp}.log")
+
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        stream_handler = logging.StreamHandler(sys.stdout)  # Use stdout with proper encoding
+        file_handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
+
+        # Configure root logger. Callers only enqueue records; the file and console
+        # writes happen on the listener's thread, off the agents' worker threads.
+        log_queue = queue.SimpleQueue()
+        root_logger.setLevel(log_level)
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, stream_handler, respect_handler_level=True
+        )
+        _listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(_listener.stop)
 
     # Create loggers for different components
     loggers = {
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
-import os
 import time
 from datetime import datetime
 from data.pipeline_db_config import init_db, SessionLocal
 from data.pipeline_db_models import SearchResult, ScrapedContent, CleanedContent, AnalysisResult
-from sqlalchemy import and_
+from sqlalchemy import and_, exists, func, select
 from logging_config import setup_logging
+from agents.intelligent_search_agent import main as search_main
+from agents.web_scraping_agent import main as scraping_main
+from agents.cleaning_validation_agent import main as cleaning_main
+from agents.analyst_agent import main as analysis_main
 
 # Setup logging
 loggers = setup_logging()
@@ -15,8 +18,8 @@ db_logger = loggers["database"]
 def check_for_duplicate_search_result(session, link):
     """Check if a search result with the given link already exists."""
     try:
-        result = session.query(SearchResult).filter(SearchResult.link == link).first() is not None
-        db_logger.debug(f"Checked for duplicate search result: {link}")
+        result = session.query(exists().where(SearchResult.link == link)).scalar()
+        db_logger.debug("Checked for duplicate search result: %s", link)
         return result
     except Exception as e:
         db_logger.error(f"Error checking for duplicate search result: {str(e)}")
@@ -24,24 +27,30 @@ def check_for_duplicate_search_result(session, link):
 
 def check_for_duplicate_scraped_content(session, search_result_id):
     """Check if scraped content for the given search result already exists."""
-    return session.query(ScrapedContent).filter(ScrapedContent.search_result_id == search_result_id).first() is not None
+    return session.query(exists().where(ScrapedContent.search_result_id == search_result_id)).scalar()
 
 def check_for_duplicate_cleaned_content(session, scraped_content_id):
     """Check if cleaned content for the given scraped content already exists."""
-    return session.query(CleanedContent).filter(CleanedContent.scraped_content_id == scraped_content_id).first() is not None
+    return session.query(exists().where(CleanedContent.scraped_content_id == scraped_content_id)).scalar()
 
 def check_for_duplicate_analysis(session, cleaned_content_id):
     """Check if analysis for the given cleaned content already exists."""
-    return session.query(AnalysisResult).filter(AnalysisResult.cleaned_content_id == cleaned_content_id).first() is not None
+    return session.query(exists().where(AnalysisResult.cleaned_content_id == cleaned_content_id)).scalar()
 
-def check_database_state():
-    """Check the current state of the database."""
-    session = SessionLocal()
+def check_database_state(session=None):
+    """Check the current state of the database.
+    
+    Uses the given session if there is one, otherwise opens its own.
+    """
+    owns_session = session is None
+    if owns_session:
+        session = SessionLocal()
     try:
-        search_results = session.query(SearchResult).count()
-        scraped_content = session.query(ScrapedContent).count()
-        cleaned_content = session.query(CleanedContent).count()
-        analysis_results = session.query(AnalysisResult).count()
+        # Count all four tables in a single statement
+        search_results, scraped_content, cleaned_content, analysis_results = session.query(
+            *(select(func.count()).select_from(model).scalar_subquery()
+              for model in (SearchResult, ScrapedContent, CleanedContent, AnalysisResult))
+        ).one()
         
         db_logger.info("Current database state:")
         db_logger.info(f"- Search Results: {search_results}")
@@ -59,7 +68,22 @@ def check_database_state():
         db_logger.error(f"Error checking database state: {str(e)}")
         raise
     finally:
-        session.close()
+        if owns_session:
+            session.close()
+        else:
+            # End the read transaction so the next check sees what the agents wrote
+            session.rollback()
+
+def run_agent(stage_logger, agent_main, *args):
+    """Run an agent's main() in this process.
+    
+    A failing agent is logged and the pipeline moves on to the next step,
+    as it did when each agent ran as its own script.
+    """
+    try:
+        agent_main(*args)
+    except Exception as e:
+        stage_logger.error(f"Agent failed with error: {str(e)}", exc_info=True)
 
 def run_pipeline():
     """Run the complete pipeline."""
@@ -75,18 +99,22 @@ def run_pipeline():
         db_logger.error(f"Failed to initialize database: {str(e)}")
         raise
     
-    # Check initial state
-    initial_state = check_database_state()
+    # One session serves every state check in this run
+    session = SessionLocal()
     
     try:
+        # Check initial state
+        initial_state = check_database_state(session)
+        
         # 1. Run intelligent search
         logger.info("\n=== Step 1: Running Intelligent Search ===")
         search_logger = loggers["search"]
         search_logger.info("Starting intelligent search process")
-        os.system("python agents/intelligent_search_agent.py")
+        # Agents run in-process with empty argument lists so they use their defaults
+        run_agent(search_logger, search_main, [])
         
         # Check state after search
-        search_state = check_database_state()
+        search_state = check_database_state(session)
         if search_state["search_results"] <= initial_state["search_results"]:
             search_logger.warning("No new search results found. This might be normal if all results are duplicates.")
         else:
@@ -96,10 +124,10 @@ def run_pipeline():
         logger.info("\n=== Step 2: Running Web Scraping ===")
         scraping_logger = loggers["scraping"]
         scraping_logger.info("Starting web scraping process")
-        os.system("python agents/web_scraping_agent.py")
+        run_agent(scraping_logger, scraping_main, [])
         
         # Check state after scraping
-        scrape_state = check_database_state()
+        scrape_state = check_database_state(session)
         if scrape_state["scraped_content"] <= initial_state["scraped_content"]:
             scraping_logger.warning("No new scraped content found. This might be normal if all content was already scraped.")
         else:
@@ -109,10 +137,10 @@ def run_pipeline():
         logger.info("\n=== Step 3: Running Cleaning and Validation ===")
         cleaning_logger = loggers["cleaning"]
         cleaning_logger.info("Starting cleaning and validation process")
-        os.system("python agents/cleaning_validation_agent.py")
+        run_agent(cleaning_logger, cleaning_main, [])
         
         # Check state after cleaning
-        clean_state = check_database_state()
+        clean_state = check_database_state(session)
         if clean_state["cleaned_content"] <= initial_state["cleaned_content"]:
             cleaning_logger.warning("No new cleaned content found. This might be normal if all content was already cleaned.")
         else:
@@ -122,10 +150,10 @@ def run_pipeline():
         logger.info("\n=== Step 4: Running Analysis ===")
         analysis_logger = loggers["analysis"]
         analysis_logger.info("Starting analysis process")
-        os.system("python agents/analyst_agent.py")
+        run_agent(analysis_logger, analysis_main)
         
         # Check final state
-        final_state = check_database_state()
+        final_state = check_database_state(session)
         
         # Calculate pipeline statistics
         end_time = time.time()
@@ -143,6 +171,8 @@ def run_pipeline():
     except Exception as e:
         logger.error(f"Pipeline failed with error: {str(e)}")
         raise
+    finally:
+        session.close()
 
 if __name__ == "__main__":
     run_pipeline() 
\ No newline at end of file
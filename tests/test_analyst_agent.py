@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import agents.analyst_agent as analyst_agent
+from data.pipeline_db_models import Base, AnalysisResult, CleanedContent
+
+def make_analysis_result(company_id, company_name, **overrides):
+    """Build an analysis result shaped like AnalystAgent.analyze_company's output."""
+    analysis_result = {
+        "company_id": company_id,
+        "company_name": company_name,
+        "overall_analysis": {
+            "analysis_text": "Analysis",
+            "sentiment": {"score": 0.5, "label": "positive", "explanation": "Good news"}
+        },
+        "content_analyses": [{"summary": "Summary"}]
+    }
+    analysis_result.update(overrides)
+    return analysis_result
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """Point the analyst at a fresh SQLite database with one cleaned content row."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'object_store.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    
+    session = factory()
+    session.add(CleanedContent(id=1, cleaned_text="Cleaned text", word_count=2))
+    session.commit()
+    session.close()
+    
+    monkeypatch.setattr(analyst_agent, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+@pytest.fixture
+def analyst(monkeypatch):
+    monkeypatch.setattr(analyst_agent, "OPENAI_API_KEY", "test-key")
+    agent = analyst_agent.AnalystAgent()
+    yield agent
+    agent.close()
+
+def test_save_analysis_rejects_unknown_cleaned_content(session_factory, analyst):
+    with pytest.raises(ValueError):
+        analyst.save_analysis(make_analysis_result("9999", "Unknown"))
+    
+    session = session_factory()
+    assert session.query(AnalysisResult).count() == 0
+    session.close()
+
+def test_bulk_save_analyses_mixed_batch_saves_no_orphans(session_factory, analyst):
+    good = make_analysis_result("1", "Good")
+    malformed = make_analysis_result("1", "Malformed")
+    del malformed["overall_analysis"]
+    unknown = make_analysis_result("9999", "Unknown")
+    
+    saved = analyst.bulk_save_analyses([good, malformed, unknown])
+    
+    assert [analysis_result["company_id"] for analysis_result in saved] == ["1"]
+    session = session_factory()
+    assert [row.cleaned_content_id for row in session.query(AnalysisResult)] == [1]
+    session.close()
+
+def test_bulk_save_analyses_retries_only_known_ids(session_factory, analyst, monkeypatch):
+    retried = []
+    save_analysis = analyst.save_analysis
+    
+    def record_save_analysis(analysis_result):
+        retried.append(analysis_result["company_name"])
+        return save_analysis(analysis_result)
+    
+    monkeypatch.setattr(analyst, "save_analysis", record_save_analysis)
+    malformed = make_analysis_result("1", "Malformed")
+    del malformed["overall_analysis"]
+    
+    analyst.bulk_save_analyses([make_analysis_result("1", "Good"), malformed, make_analysis_result("9999", "Unknown")])
+    
+    assert retried == ["Good", "Malformed"]